@@ -5,6 +5,7 @@ Usage: python check_admin.py
 """
 import os
 import django
+from collections import Counter
 
 # Setup Django environment
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crm_project.settings')
@@ -14,15 +15,20 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# Rows fetched per round trip when listing all users
+USER_CHUNK_SIZE = 2000
+
 def check_admin_user():
     print("🔍 Checking for admin users...")
     print("=" * 40)
     
-    # Find admin users
-    admin_users = User.objects.filter(role='admin')
+    # Find admin users, materialized once for the count and the listing
+    admin_users = list(
+        User.objects.filter(role='admin').only('username', 'email', 'role', 'is_staff', 'is_superuser', 'is_active')
+    )
     
-    if admin_users.exists():
-        print(f"✅ Found {admin_users.count()} admin user(s):")
+    if admin_users:
+        print(f"✅ Found {len(admin_users)} admin user(s):")
         for user in admin_users:
             print(f"\n👤 Username: {user.username}")
             print(f"   Email: {user.email or 'Not set'}")
@@ -40,16 +46,21 @@ def check_admin_user():
     # Show all users and their roles
     print("\n📊 All users in system:")
     print("-" * 40)
-    all_users = User.objects.all().order_by('role', 'username')
+    role_map = dict(User._meta.get_field('role').choices)
+    # Stream rows in chunks so memory stays flat on large user tables
+    rows = User.objects.order_by('role', 'username').values_list(
+        'username', 'role', 'is_active'
+    ).iterator(chunk_size=USER_CHUNK_SIZE)
+    
+    # Single pass: print each user and tally roles as we go
+    role_counts = Counter()
+    for username, role, is_active in rows:
+        role_display = role_map.get(role, role)
+        role_counts[role_display] += 1
+        status = "Active" if is_active else "Inactive"
+        print(f"  {username:15} | {role_display:15} | {status}")
     
-    if all_users.exists():
-        role_counts = {}
-        for user in all_users:
-            role = user.get_role_display()
-            role_counts[role] = role_counts.get(role, 0) + 1
-            status = "Active" if user.is_active else "Inactive"
-            print(f"  {user.username:15} | {role:15} | {status}")
-        
+    if role_counts:
         print("\n📈 User role summary:")
         for role, count in sorted(role_counts.items()):
             print(f"  {role}: {count}")
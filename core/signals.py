@@ -0,0 +1,25 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from sales_funnel.models import SalesFunnel
+from teams.models import Team, Group, TeamMembership
+
+# Version stamp mixed into every cached home dashboard key; bumping it
+# invalidates all per-user funnel stats at once
+HOME_FUNNEL_STATS_VERSION_KEY = 'home_funnel_stats:version'
+
+def get_home_funnel_stats_version():
+    return cache.get_or_set(HOME_FUNNEL_STATS_VERSION_KEY, 1, timeout=None)
+
+@receiver(post_save, sender=SalesFunnel)
+@receiver(post_delete, sender=SalesFunnel)
+@receiver(post_save, sender=TeamMembership)
+@receiver(post_delete, sender=TeamMembership)
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=Team)
+def invalidate_home_funnel_stats(sender, **kwargs):
+    try:
+        cache.incr(HOME_FUNNEL_STATS_VERSION_KEY)
+    except ValueError:
+        # Key expired or was never set; a fresh version starts at 1
+        cache.set(HOME_FUNNEL_STATS_VERSION_KEY, 2, timeout=None)
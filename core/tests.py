@@ -1,3 +1,115 @@
-from django.test import TestCase
+from django.test import TestCase, Client
+from django.urls import reverse
+from decimal import Decimal
+from users.models import User
+from teams.models import Team, Group, TeamMembership
+from sales_funnel.models import SalesFunnel
 
-# Create your tests here.
+class HomeFunnelStatsTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.avp = User.objects.create_user(username='avp1', password='pass', role='avp')
+        self.supervisor = User.objects.create_user(username='sup1', password='pass', role='supervisor')
+        self.sp1 = User.objects.create_user(username='sp1', password='pass', role='salesperson')
+        self.sp2 = User.objects.create_user(username='sp2', password='pass', role='salesperson')
+        self.team = Team.objects.create(name='TEAM A', avp=self.avp)
+        self.group = Group.objects.create(name='Group X', team=self.team, group_type='regular', supervisor=self.supervisor)
+        TeamMembership.objects.create(user=self.sp1, group=self.group)
+        for stage, retail in [('quoted', '1000.00'), ('closable', '2000.00'), ('quoted', '3000.00')]:
+            SalesFunnel.objects.create(
+                date_created='2025-01-15',
+                company_name='Co',
+                requirement_description='Req',
+                cost=Decimal('100.00'),
+                retail=Decimal(retail),
+                stage=stage,
+                salesperson=self.sp1,
+            )
+        # Outside the supervisor's group
+        SalesFunnel.objects.create(
+            date_created='2025-01-15',
+            company_name='Other',
+            requirement_description='Req',
+            cost=Decimal('100.00'),
+            retail=Decimal('900000.00'),
+            stage='project',
+            salesperson=self.sp2,
+        )
+
+    def test_supervisor_stats_scoped_to_group(self):
+        self.client.force_login(self.supervisor)
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        stats = response.context['funnel_stats']
+        self.assertEqual(stats['total_entries'], 3)
+        self.assertEqual(stats['quoted_count'], 2)
+        self.assertEqual(stats['closable_count'], 1)
+        self.assertEqual(stats['project_count'], 0)
+        self.assertEqual(stats['total_value'], Decimal('6000.00'))
+
+    def test_admin_sees_all_entries(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('home'))
+        stats = response.context['funnel_stats']
+        self.assertEqual(stats['total_entries'], 4)
+        self.assertEqual(stats['project_count'], 1)
+        self.assertEqual(stats['total_value'], Decimal('906000.00'))
+
+    def test_stats_cache_invalidated_on_funnel_change(self):
+        self.client.force_login(self.supervisor)
+        self.client.get(reverse('home'))
+        SalesFunnel.objects.create(
+            date_created='2025-01-16',
+            company_name='Co',
+            requirement_description='Req',
+            cost=Decimal('100.00'),
+            retail=Decimal('500.00'),
+            stage='closable',
+            salesperson=self.sp1,
+        )
+        response = self.client.get(reverse('home'))
+        stats = response.context['funnel_stats']
+        self.assertEqual(stats['total_entries'], 4)
+        self.assertEqual(stats['closable_count'], 2)
+
+    def test_supervisor_scope_follows_membership_moves(self):
+        other_supervisor = User.objects.create_user(username='sup2', password='pass', role='supervisor')
+        other_group = Group.objects.create(name='Group Y', team=self.team, group_type='regular', supervisor=other_supervisor)
+        membership = self.sp1.team_membership
+        membership.group = other_group
+        membership.save()
+
+        self.client.force_login(self.supervisor)
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['funnel_stats']['total_entries'], 0)
+
+        self.client.force_login(other_supervisor)
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['funnel_stats']['total_entries'], 3)
+
+    def test_recent_entries_render_truncated_description(self):
+        SalesFunnel.objects.create(
+            date_created='2025-02-01',
+            company_name='Latest',
+            requirement_description='x' * 100,
+            cost=Decimal('100.00'),
+            retail=Decimal('500.00'),
+            stage='quoted',
+            salesperson=self.sp1,
+        )
+        self.client.force_login(self.supervisor)
+        response = self.client.get(reverse('home'))
+        latest = response.context['recent_funnel_entries'][0]
+        self.assertEqual(latest.requirement_preview, 'x' * 41)
+        self.assertContains(response, 'x' * 39 + '…')
+        self.assertNotContains(response, 'x' * 41)
+
+    def test_ineligible_role_skips_funnel_queries(self):
+        techmgr = User.objects.create_user(username='tech1', password='pass', role='techmgr')
+        self.client.force_login(techmgr)
+        self.client.get(reverse('home'))  # warm session/auth lookups
+        with self.assertNumQueries(2):  # session + user only
+            response = self.client.get(reverse('home'))
+        self.assertFalse(response.context['show_funnel'])
+        self.assertNotIn('funnel_stats', response.context)
@@ -5,87 +5,86 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import logout
 from django.contrib import messages
-from django.db.models import Sum, Count
+from django.core.cache import cache
+from django.db.models import Sum, Count, Q, Value, DecimalField
+from django.db.models.functions import Coalesce, Substr
 from sales_funnel.models import SalesFunnel
-from teams.models import Team, Group, TeamMembership
+from users.models import User
+from .signals import get_home_funnel_stats_version
+
+# Seconds a user's home dashboard funnel stats stay cached
+HOME_FUNNEL_STATS_TIMEOUT = 60
+
+# Executives and admins can see all funnel entries
+EXECUTIVE_ROLES = frozenset({User.Role.ADMIN, User.Role.PRESIDENT, User.Role.GM, User.Role.VP})
+
+# Roles allowed to add funnel entries from the home dashboard
+FUNNEL_ADD_ROLES = frozenset({User.Role.SALESPERSON, User.Role.SUPERVISOR, User.Role.ASM, User.Role.AVP})
+
+# Role -> builder returning the Q that scopes a user's visible funnel entries.
+# Team-based roles filter on SalesFunnel's denormalized hierarchy columns, so
+# no TeamMembership join is needed.
+ROLE_FUNNEL_BUILDERS = {
+    User.Role.SALESPERSON: lambda user: Q(salesperson=user),
+    # Supervisor can see entries from their groups
+    User.Role.SUPERVISOR: lambda user: Q(supervisor=user),
+    # Teamlead can see entries from their assigned group
+    User.Role.TEAMLEAD: lambda user: Q(teamlead=user),
+    # ASM can see entries from their teams
+    User.Role.ASM: lambda user: Q(team__asm=user),
+    # AVP can see entries from their teams
+    User.Role.AVP: lambda user: Q(avp=user),
+    **{role: (lambda user: Q()) for role in EXECUTIVE_ROLES},
+}
+
+FUNNEL_ELIGIBLE_ROLES = frozenset(ROLE_FUNNEL_BUILDERS)
 
 @login_required
 def home(request):
     user = request.user
-    context = {'user': user}
     
-    # Add sales funnel data for eligible users
-    if user.role in ['salesperson', 'supervisor', 'teamlead', 'asm', 'avp', 'admin', 'president', 'gm', 'vp']:
-        # Get funnel entries based on user role
-        if user.role == 'salesperson':
-            funnel_entries = SalesFunnel.objects.filter(
-                salesperson=user,
-                is_active=True,
-                is_closed=False
-            )
-        elif user.role == 'supervisor':
-            # Supervisor can see entries from their groups
-            groups = Group.objects.filter(supervisor=user)
-            salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-            funnel_entries = SalesFunnel.objects.filter(
-                salesperson_id__in=salespeople_ids,
-                is_active=True,
-                is_closed=False
-            )
-        elif user.role == 'teamlead':
-            # Teamlead can see entries from their assigned group
-            teamlead_groups = Group.objects.filter(teamlead=user)
-            salespeople_ids = TeamMembership.objects.filter(group__in=teamlead_groups).values_list('user_id', flat=True)
-            funnel_entries = SalesFunnel.objects.filter(
-                salesperson_id__in=salespeople_ids,
-                is_active=True,
-                is_closed=False
-            )
-        elif user.role == 'asm':
-            # ASM can see entries from their teams
-            asm_teams = user.asm_teams.all()
-            groups = Group.objects.filter(team__in=asm_teams)
-            salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-            funnel_entries = SalesFunnel.objects.filter(
-                salesperson_id__in=salespeople_ids,
-                is_active=True,
-                is_closed=False
-            )
-        elif user.role == 'avp':
-            # AVP can see entries from their teams
-            teams = Team.objects.filter(avp=user)
-            groups = Group.objects.filter(team__in=teams)
-            salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-            funnel_entries = SalesFunnel.objects.filter(
-                salesperson_id__in=salespeople_ids,
-                is_active=True,
-                is_closed=False
-            )
-        else:
-            # Executives and admins can see all entries
-            funnel_entries = SalesFunnel.objects.filter(
-                is_active=True,
-                is_closed=False
-            )
-        
-        # Calculate funnel statistics
-        funnel_stats = {
-            'quoted_count': funnel_entries.filter(stage='quoted').count(),
-            'closable_count': funnel_entries.filter(stage='closable').count(),
-            'project_count': funnel_entries.filter(stage='project').count(),
-            'total_value': funnel_entries.aggregate(Sum('retail'))['retail__sum'] or 0,
-            'total_entries': funnel_entries.count(),
-        }
-        
-        # Get recent entries for quick view (limit to 5)
-        recent_entries = funnel_entries.select_related('salesperson', 'customer').order_by('-date_created')[:5]
-        
-        context.update({
-            'funnel_stats': funnel_stats,
-            'recent_funnel_entries': recent_entries,
-            'show_funnel': True,
-            'can_add_funnel': user.role in ['salesperson', 'supervisor', 'asm', 'avp'],
-        })
+    # Users without funnel access get the plain dashboard with no DB work
+    if user.role not in FUNNEL_ELIGIBLE_ROLES:
+        return render(request, 'core/home.html', {'user': user, 'show_funnel': False})
+    
+    # Get funnel entries based on user role
+    scope = ROLE_FUNNEL_BUILDERS[user.role](user)
+    funnel_entries = SalesFunnel.objects.filter(scope, is_active=True, is_closed=False)
+
+    # Calculate funnel statistics in a single conditional aggregate, cached
+    # briefly per user; any SalesFunnel write bumps the cache version
+    cache_key = f'home_funnel_stats:{get_home_funnel_stats_version()}:{user.id}:{user.role}'
+    funnel_stats = cache.get_or_set(
+        cache_key,
+        lambda: funnel_entries.aggregate(
+            quoted_count=Count('id', filter=Q(stage='quoted')),
+            closable_count=Count('id', filter=Q(stage='closable')),
+            project_count=Count('id', filter=Q(stage='project')),
+            total_value=Coalesce(Sum('retail'), Value(0), output_field=DecimalField()),
+            total_entries=Count('id'),
+        ),
+        timeout=HOME_FUNNEL_STATS_TIMEOUT,
+    )
+    
+    # Get recent entries for quick view (limit to 5), fetching only the
+    # columns the dashboard table renders. The description is shown
+    # truncated to 40 chars, so only a 41-char prefix leaves the database.
+    recent_entries = funnel_entries.select_related('salesperson').only(
+        'id', 'date_created', 'company_name',
+        'stage', 'cost', 'retail',
+        'salesperson__username', 'salesperson__first_name',
+        'salesperson__last_name', 'salesperson__initials',
+    ).annotate(
+        requirement_preview=Substr('requirement_description', 1, 41),
+    ).order_by('-date_created')[:5]
+    
+    context = {
+        'user': user,
+        'funnel_stats': funnel_stats,
+        'recent_funnel_entries': recent_entries,
+        'show_funnel': True,
+        'can_add_funnel': user.role in FUNNEL_ADD_ROLES,
+    }
     
     return render(request, 'core/home.html', context)
 
@@ -21,111 +21,73 @@ from teams.models import Team, Group, TeamMembership
 from customers.models import Customer
 from sales_funnel.models import SalesFunnel
 from sales_monitoring.models import SalesActivity, ActivityType
+from django.contrib.auth.hashers import make_password
+
+# Rows per multi-row INSERT
+BATCH_SIZE = 500
+
+# Sample activity types: (name, description, icon, color)
+ACTIVITY_TYPE_SEED = (
+    ('Call', 'Phone calls to prospects and customers', 'fas fa-phone', 'primary'),
+    ('Meeting', 'Face-to-face or virtual meetings', 'fas fa-handshake', 'success'),
+    ('Email', 'Email communications', 'fas fa-envelope', 'info'),
+    ('Proposal', 'Proposal creation and presentation', 'fas fa-file-contract', 'warning'),
+    ('Follow-up', 'Follow-up activities', 'fas fa-redo', 'secondary'),
+)
 
 def create_sample_users():
     """Create sample users for testing"""
     print("Creating sample users...")
     
-    # Create VP
-    vp_user, created = User.objects.get_or_create(
-        username='vp_john',
-        defaults={
-            'first_name': 'John',
-            'last_name': 'VP',
-            'email': 'vp@company.com',
-            'role': 'vp',
-            'is_active': True
-        }
-    )
-    if created:
-        vp_user.set_password('password123')
-        vp_user.save()
-    
-    # Create AVPs
-    avp1, created = User.objects.get_or_create(
-        username='avp_alice',
-        defaults={
-            'first_name': 'Alice',
-            'last_name': 'AVP',
-            'email': 'avp1@company.com',
-            'role': 'avp',
-            'is_active': True
-        }
-    )
-    if created:
-        avp1.set_password('password123')
-        avp1.save()
-    
-    avp2, created = User.objects.get_or_create(
-        username='avp_bob',
-        defaults={
-            'first_name': 'Bob',
-            'last_name': 'AVP',
-            'email': 'avp2@company.com',
-            'role': 'avp',
-            'is_active': True
-        }
-    )
-    if created:
-        avp2.set_password('password123')
-        avp2.save()
+    # Hash the shared sample password once and reuse it for every user
+    shared_hash = make_password('password123')
     
-    # Create Supervisors
-    supervisor1, created = User.objects.get_or_create(
-        username='sup_carol',
-        defaults={
-            'first_name': 'Carol',
-            'last_name': 'Supervisor',
-            'email': 'sup1@company.com',
-            'role': 'supervisor',
-            'is_active': True
-        }
-    )
-    if created:
-        supervisor1.set_password('password123')
-        supervisor1.save()
-    
-    supervisor2, created = User.objects.get_or_create(
-        username='sup_dave',
-        defaults={
-            'first_name': 'Dave',
-            'last_name': 'Supervisor',
-            'email': 'sup2@company.com',
-            'role': 'supervisor',
-            'is_active': True
-        }
-    )
-    if created:
-        supervisor2.set_password('password123')
-        supervisor2.save()
+    user_specs = [
+        # VP
+        ('vp_john', 'John', 'VP', 'vp@company.com', 'vp', ''),
+        # AVPs
+        ('avp_alice', 'Alice', 'AVP', 'avp1@company.com', 'avp', ''),
+        ('avp_bob', 'Bob', 'AVP', 'avp2@company.com', 'avp', ''),
+        # Supervisors
+        ('sup_carol', 'Carol', 'Supervisor', 'sup1@company.com', 'supervisor', ''),
+        ('sup_dave', 'Dave', 'Supervisor', 'sup2@company.com', 'supervisor', ''),
+    ]
     
-    # Create Salespeople
-    salespeople = []
+    # Salespeople
     sales_names = [
         ('Emma', 'Johnson'), ('Michael', 'Smith'), ('Sarah', 'Davis'),
         ('James', 'Wilson'), ('Lisa', 'Brown'), ('David', 'Taylor'),
         ('Anna', 'Miller'), ('Chris', 'Anderson'), ('Jennifer', 'Garcia')
     ]
-    
+    sales_usernames = []
     for i, (first, last) in enumerate(sales_names):
         username = f'sales_{first.lower()}'
-        user, created = User.objects.get_or_create(
-            username=username,
-            defaults={
-                'first_name': first,
-                'last_name': last,
-                'email': f'{username}@company.com',
-                'role': 'salesperson',
-                'is_active': True,
-                'initials': f'{first[0]}{last[0]}{str(i+1)}'
-            }
-        )
-        if created:
-            user.set_password('password123')
-            user.save()
-        salespeople.append(user)
+        sales_usernames.append(username)
+        user_specs.append((username, first, last, f'{username}@company.com', 'salesperson', f'{first[0]}{last[0]}{str(i+1)}'))
     
-    return vp_user, avp1, avp2, supervisor1, supervisor2, salespeople
+    # Existing usernames are skipped so re-running the script is idempotent
+    User.objects.bulk_create(
+        [
+            User(
+                username=username,
+                first_name=first,
+                last_name=last,
+                email=email,
+                role=role,
+                initials=initials,
+                is_active=True,
+                password=shared_hash,
+            )
+            for username, first, last, email, role, initials in user_specs
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    
+    users = User.objects.in_bulk([spec[0] for spec in user_specs], field_name='username')
+    salespeople = [users[username] for username in sales_usernames]
+    
+    return users['vp_john'], users['avp_alice'], users['avp_bob'], users['sup_carol'], users['sup_dave'], salespeople
 
 def create_sample_teams_and_groups(avp1, avp2, supervisor1, supervisor2, salespeople):
     """Create sample teams and groups"""
@@ -170,14 +132,13 @@ def create_sample_teams_and_groups(avp1, avp2, supervisor1, supervisor2, salespe
         }
     )
     
-    # Assign salespeople to groups
+    # Assign salespeople to groups; existing memberships are left untouched
     groups = [group1, group2, group3]
-    for i, salesperson in enumerate(salespeople):
-        group = groups[i % len(groups)]
-        membership, created = TeamMembership.objects.get_or_create(
-            user=salesperson,
-            defaults={'group': group}
-        )
+    TeamMembership.objects.bulk_create(
+        [TeamMembership(user=salesperson, group=groups[i % len(groups)]) for i, salesperson in enumerate(salespeople)],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
     
     return [group1, group2, group3]
 
@@ -192,32 +153,59 @@ def create_sample_customers_and_deals(salespeople):
         'Energy Solutions', 'Food & Beverage Co', 'Real Estate Group'
     ]
     
-    customers = []
-    for i, company_name in enumerate(companies):
-        customer, created = Customer.objects.get_or_create(
-            company_name=company_name,
-            defaults={
-                'contact_person_name': f'Contact Person {i+1}',
-                'email': f'contact{i+1}@{company_name.lower().replace(" ", "").replace("&", "")}.com',
-                'phone_number': f'+63915555{1000+i}',
-                'industry': random.choice(['technology', 'manufacturing', 'healthcare', 'financial', 'retail']),
-                'territory': random.choice(['makati', 'bgc', 'ortigas', 'manila', 'quezoncity']),
-                'is_active': True,
-                'salesperson': random.choice(salespeople)
-            }
-        )
-        customers.append(customer)
+    existing_customers = set(Customer.objects.filter(company_name__in=companies).values_list('company_name', flat=True))
+    Customer.objects.bulk_create(
+        [
+            Customer(
+                company_name=company_name,
+                contact_person_name=f'Contact Person {i+1}',
+                email=f'contact{i+1}@{company_name.lower().replace(" ", "").replace("&", "")}.com',
+                phone_number=f'+63915555{1000+i}',
+                industry=random.choice(['technology', 'manufacturing', 'healthcare', 'financial', 'retail']),
+                territory=random.choice(['makati', 'bgc', 'ortigas', 'manila', 'quezoncity']),
+                is_active=True,
+                salesperson=random.choice(salespeople),
+            )
+            for i, company_name in enumerate(companies)
+            if company_name not in existing_customers
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    customers = list(Customer.objects.filter(company_name__in=companies))
+    
+    # bulk_create skips SalesFunnel.save(), so resolve each salesperson's
+    # denormalized group hierarchy up front
+    hierarchies = {
+        membership.user_id: SalesFunnel.hierarchy_for_group(membership.group)
+        for membership in TeamMembership.objects.select_related('group__team').filter(user__in=salespeople)
+    }
     
     # Create sales funnel entries
     stages = ['quoted', 'closable', 'project']
-    outcomes = ['active', 'won', 'lost']
     
-    for i in range(30):  # Create 30 sample deals
-        cost = Decimal(random.randint(10000, 500000))
+    deal_names = [f"Deal Company {i+1}" for i in range(30)]  # Create 30 sample deals
+    existing_deals = set(SalesFunnel.objects.filter(company_name__in=deal_names).values_list('company_name', flat=True))
+    
+    # Draw each random column for all deals in one batched call
+    n = len(deal_names)
+    deal_costs = random.choices(range(10000, 500001), k=n)
+    deal_months_back = random.choices(range(0, 7), k=n)
+    deal_stages = random.choices(stages, k=n)
+    deal_salespeople = random.choices(salespeople, k=n)
+    deal_customers = random.choices(customers, k=n)
+    deal_has_customer = random.choices([True, False], weights=[7, 3], k=n)
+    deal_probabilities = random.choices(range(20, 91), k=n)
+    
+    entries = []
+    for i, deal_name in enumerate(deal_names):
+        if deal_name in existing_deals:
+            continue
+        cost = Decimal(deal_costs[i])
         retail = cost * Decimal(random.uniform(1.2, 2.5))  # 20% to 150% markup
         
         # Create dates - some current month, some previous months
-        months_back = random.randint(0, 6)
+        months_back = deal_months_back[i]
         deal_date = date.today() - timedelta(days=months_back * 30)
         
         # Determine outcome based on age
@@ -230,57 +218,66 @@ def create_sample_customers_and_deals(salespeople):
             is_closed = False
             closed_date = None
         
-        SalesFunnel.objects.get_or_create(
-            company_name=f"Deal Company {i+1}",
-            defaults={
-                'date_created': deal_date,
-                'requirement_description': f'Sample requirement description for deal {i+1}',
-                'cost': cost,
-                'retail': retail,
-                'stage': random.choice(stages),
-                'salesperson': random.choice(salespeople),
-                'customer': random.choice(customers) if random.random() > 0.3 else None,
-                'expected_close_date': deal_date + timedelta(days=random.randint(30, 90)),
-                'probability': random.randint(20, 90),
-                'is_active': not is_closed,
-                'is_closed': is_closed,
-                'deal_outcome': outcome,
-                'closed_date': closed_date,
-                'notes': f'Sample notes for deal {i+1}'
-            }
-        )
+        stage = deal_stages[i]
+        if not is_closed and stage == 'project' and retail < Decimal('500000'):
+            stage = 'services'
+        
+        salesperson = deal_salespeople[i]
+        entries.append(SalesFunnel(
+            company_name=deal_name,
+            date_created=deal_date,
+            requirement_description=f'Sample requirement description for deal {i+1}',
+            cost=cost,
+            retail=retail,
+            stage=stage,
+            salesperson=salesperson,
+            customer=deal_customers[i] if deal_has_customer[i] else None,
+            expected_close_date=deal_date + timedelta(days=random.randint(30, 90)),
+            probability=deal_probabilities[i],
+            is_active=not is_closed,
+            is_closed=is_closed,
+            deal_outcome=outcome,
+            closed_date=closed_date,
+            notes=f'Sample notes for deal {i+1}',
+            **hierarchies.get(salesperson.id, SalesFunnel.hierarchy_for_group(None)),
+        ))
+    SalesFunnel.objects.bulk_create(entries, batch_size=BATCH_SIZE)
 
 def create_sample_activities(salespeople):
     """Create sample sales activities"""
     print("Creating sample sales activities...")
     
-    # Ensure activity types exist
-    activity_types = [
-        ('Call', 'Phone calls to prospects and customers', 'fas fa-phone', 'primary'),
-        ('Meeting', 'Face-to-face or virtual meetings', 'fas fa-handshake', 'success'),
-        ('Email', 'Email communications', 'fas fa-envelope', 'info'),
-        ('Proposal', 'Proposal creation and presentation', 'fas fa-file-contract', 'warning'),
-        ('Follow-up', 'Follow-up activities', 'fas fa-redo', 'secondary'),
-    ]
-    
-    for name, desc, icon, color in activity_types:
-        ActivityType.objects.get_or_create(
-            name=name,
-            defaults={
-                'description': desc,
-                'icon': icon,
-                'color': color,
-                'is_active': True
-            }
-        )
+    # Ensure activity types exist, inserting only the missing ones
+    existing_types = set(
+        ActivityType.objects.filter(name__in=[seed[0] for seed in ACTIVITY_TYPE_SEED]).values_list('name', flat=True)
+    )
+    ActivityType.objects.bulk_create([
+        ActivityType(name=name, description=desc, icon=icon, color=color, is_active=True)
+        for name, desc, icon, color in ACTIVITY_TYPE_SEED
+        if name not in existing_types
+    ])
     
     # Create activities for the last 30 days
-    activity_types_qs = ActivityType.objects.filter(is_active=True)
+    activity_types_qs = list(ActivityType.objects.filter(is_active=True))
     statuses = ['planned', 'in_progress', 'completed', 'cancelled']
     priorities = ['low', 'medium', 'high', 'urgent']
     
-    for i in range(100):  # Create 100 sample activities
-        days_back = random.randint(0, 30)
+    titles = [f'Sample Activity {i+1}' for i in range(100)]  # Create 100 sample activities
+    existing_titles = set(SalesActivity.objects.filter(title__in=titles).values_list('title', flat=True))
+    
+    # Draw each random column for all activities in one batched call
+    n = len(titles)
+    activity_days_back = random.choices(range(0, 31), k=n)
+    activity_type_draws = random.choices(activity_types_qs, k=n)
+    activity_salespeople = random.choices(salespeople, k=n)
+    activity_priorities = random.choices(priorities, k=n)
+    activity_follow_ups = random.choices([True, False], k=n)
+    
+    activities = []
+    for i, title in enumerate(titles):
+        if title in existing_titles:
+            continue
+        days_back = activity_days_back[i]
         activity_date = datetime.now() - timedelta(days=days_back)
         
         # Determine status based on age
@@ -289,23 +286,22 @@ def create_sample_activities(salespeople):
         else:
             status = random.choice(['planned', 'in_progress', 'completed'])
         
-        SalesActivity.objects.get_or_create(
-            title=f'Sample Activity {i+1}',
-            defaults={
-                'description': f'Sample description for activity {i+1}',
-                'activity_type': random.choice(activity_types_qs),
-                'salesperson': random.choice(salespeople),
-                'status': status,
-                'priority': random.choice(priorities),
-                'scheduled_start': activity_date,
-                'scheduled_end': activity_date + timedelta(hours=random.randint(1, 4)),
-                'actual_start': activity_date if status in ['completed', 'cancelled'] else None,
-                'actual_end': activity_date + timedelta(hours=random.randint(1, 4)) if status == 'completed' else None,
-                'notes': f'Sample notes for activity {i+1}',
-                'follow_up_required': random.choice([True, False]),
-                'reviewed_by_supervisor': random.choice([True, False]) if status == 'completed' else False
-            }
-        )
+        activities.append(SalesActivity(
+            title=title,
+            description=f'Sample description for activity {i+1}',
+            activity_type=activity_type_draws[i],
+            salesperson=activity_salespeople[i],
+            status=status,
+            priority=activity_priorities[i],
+            scheduled_start=activity_date,
+            scheduled_end=activity_date + timedelta(hours=random.randint(1, 4)),
+            actual_start=activity_date if status in ['completed', 'cancelled'] else None,
+            actual_end=activity_date + timedelta(hours=random.randint(1, 4)) if status == 'completed' else None,
+            notes=f'Sample notes for activity {i+1}',
+            follow_up_required=activity_follow_ups[i],
+            reviewed_by_supervisor=random.choice([True, False]) if status == 'completed' else False,
+        ))
+    SalesActivity.objects.bulk_create(activities, batch_size=BATCH_SIZE)
 
 def main():
     """Main function to create all sample data"""
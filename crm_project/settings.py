@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import importlib.util
 import os
 
 from pathlib import Path
@@ -61,6 +62,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Serve static files from WhiteNoise when it is installed (production
+# requirements), keeping file I/O off the Django view stack
+if importlib.util.find_spec('whitenoise') is not None:
+    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+    WHITENOISE_USE_FINDERS = DEBUG
+
 ROOT_URLCONF = 'crm_project.urls'
 
 TEMPLATES = [
@@ -91,6 +98,24 @@ DATABASES = {
     }
 }
 
+# models.W040 warns that a backend ignores Index.include. The covering index on
+# CustomerBackup (cb_cov_idx) is meant for PostgreSQL only; on SQLite it degrades
+# to a plain (customer, -created_at) index, which is fine for development. The
+# silence is project-wide, so any new INCLUDE index must be checked against
+# PostgreSQL by hand.
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'crm-default',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,8 +157,14 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
 # Media files (uploads)
-MEDIA_URL = '/media/'
+# Set MEDIA_URL to a CDN/nginx origin in production; Django itself only
+# serves media under DEBUG
+MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
 MEDIA_ROOT = BASE_DIR / 'media'
+# Internal nginx location aliasing MEDIA_ROOT (e.g. '/protected-media/'); when
+# set, shared file downloads are handed to nginx via X-Accel-Redirect. MEDIA_ROOT
+# then must not also be published under MEDIA_URL, or the access checks are bypassed
+FILE_SHARING_ACCEL_REDIRECT_PREFIX = os.getenv('FILE_SHARING_ACCEL_REDIRECT_PREFIX', '')
 
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
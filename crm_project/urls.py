@@ -6,7 +6,6 @@ from django.urls import path, include
 from core.views import home, logout_view
 from django.contrib.auth import views as auth_views
 from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -24,4 +23,5 @@ urlpatterns = [
 
 # Serve media files during development
 if settings.DEBUG:
+    from django.conf.urls.static import static
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -4,6 +4,54 @@ from users.models import User
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Submit, HTML
 
+def get_salesperson_choices():
+    """Return (pk, username) choices for active salespeople"""
+    # Read fresh on every form: a cross-request cache would be per-process
+    # LocMemCache, so other workers would keep offering stale salespeople
+    return list(
+        User.objects.filter(role='salesperson', is_active=True).values_list('id', 'username')
+    )
+
+# Layouts are built once at import and shared by every form instance
+CUSTOMER_FORM_LAYOUT = Layout(
+    HTML('<h5 class="mb-3">Basic Information</h5>'),
+    Row(
+        Column('company_name', css_class='form-group col-md-6 mb-3'),
+        Column('contact_person_name', css_class='form-group col-md-6 mb-3'),
+    ),
+    'contact_person_position',
+    Row(
+        Column('email', css_class='form-group col-md-6 mb-3'),
+        Column('phone_number', css_class='form-group col-md-6 mb-3'),
+    ),
+    'address',
+    
+    HTML('<h5 class="mb-3 mt-4">Business Information</h5>'),
+    Row(
+        Column('industry', css_class='form-group col-md-6 mb-3'),
+        Column('territory', css_class='form-group col-md-6 mb-3'),
+    ),
+    
+    HTML('<h5 class="mb-3 mt-4">Status & Assignment</h5>'),
+    Row(
+        Column(
+            HTML('<div class="form-check mb-3">'),
+            'is_vip',
+            HTML('</div>'),
+            css_class='col-md-6'
+        ),
+        Column(
+            HTML('<div class="form-check mb-3">'),
+            'is_active',
+            HTML('</div>'),
+            css_class='col-md-6'
+        ),
+    ),
+    'salesperson',
+    HTML('<br>'),
+    Submit('submit', 'Save Customer', css_class='btn btn-primary')
+)
+
 class CustomerForm(forms.ModelForm):
     class Meta:
         model = Customer
@@ -25,55 +73,48 @@ class CustomerForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Only show active salespeople in the dropdown
-        self.fields['salesperson'].queryset = User.objects.filter(
+        # Only show active salespeople in the dropdown. The queryset still
+        # validates submissions; the rendered options come from one values_list query.
+        salesperson_field = self.fields['salesperson']
+        salesperson_field.queryset = User.objects.filter(
             role='salesperson', 
             is_active=True
         )
+        salesperson_field.choices = [('', salesperson_field.empty_label)] + get_salesperson_choices()
         
         # Add CSS classes and help text
         self.fields['industry'].widget.attrs.update({'class': 'form-select'})
         self.fields['territory'].widget.attrs.update({'class': 'form-select'})
         
         self.helper = FormHelper()
-        self.helper.layout = Layout(
-            HTML('<h5 class="mb-3">Basic Information</h5>'),
-            Row(
-                Column('company_name', css_class='form-group col-md-6 mb-3'),
-                Column('contact_person_name', css_class='form-group col-md-6 mb-3'),
-            ),
-            'contact_person_position',
-            Row(
-                Column('email', css_class='form-group col-md-6 mb-3'),
-                Column('phone_number', css_class='form-group col-md-6 mb-3'),
-            ),
-            'address',
-            
-            HTML('<h5 class="mb-3 mt-4">Business Information</h5>'),
-            Row(
-                Column('industry', css_class='form-group col-md-6 mb-3'),
-                Column('territory', css_class='form-group col-md-6 mb-3'),
-            ),
-            
-            HTML('<h5 class="mb-3 mt-4">Status & Assignment</h5>'),
-            Row(
-                Column(
-                    HTML('<div class="form-check mb-3">'),
-                    'is_vip',
-                    HTML('</div>'),
-                    css_class='col-md-6'
-                ),
-                Column(
-                    HTML('<div class="form-check mb-3">'),
-                    'is_active',
-                    HTML('</div>'),
-                    css_class='col-md-6'
-                ),
-            ),
-            'salesperson',
-            HTML('<br>'),
-            Submit('submit', 'Save Customer', css_class='btn btn-primary')
-        )
+        self.helper.layout = CUSTOMER_FORM_LAYOUT
+    
+    def clean_email(self):
+        # Normalize before the unique check so case variants are reported as duplicates
+        return Customer.normalize_email(self.cleaned_data['email'])
+
+SALESPERSON_CUSTOMER_FORM_LAYOUT = Layout(
+    HTML('<div class="alert alert-info"><i class="fas fa-info-circle"></i> You will be automatically assigned as the salesperson for this customer.</div>'),
+    HTML('<h5 class="mb-3">Basic Information</h5>'),
+    Row(
+        Column('company_name', css_class='form-group col-md-6 mb-3'),
+        Column('contact_person_name', css_class='form-group col-md-6 mb-3'),
+    ),
+    'contact_person_position',
+    Row(
+        Column('email', css_class='form-group col-md-6 mb-3'),
+        Column('phone_number', css_class='form-group col-md-6 mb-3'),
+    ),
+    'address',
+    
+    HTML('<h5 class="mb-3 mt-4">Business Information</h5>'),
+    Row(
+        Column('industry', css_class='form-group col-md-6 mb-3'),
+        Column('territory', css_class='form-group col-md-6 mb-3'),
+    ),
+    HTML('<br>'),
+    Submit('submit', 'Add Customer', css_class='btn btn-primary')
+)
 
 class SalespersonCustomerForm(forms.ModelForm):
     """Form for salespeople to add new customers - automatically assigns them as salesperson"""
@@ -98,28 +139,10 @@ class SalespersonCustomerForm(forms.ModelForm):
         self.fields['territory'].widget.attrs.update({'class': 'form-select'})
         
         self.helper = FormHelper()
-        self.helper.layout = Layout(
-            HTML('<div class="alert alert-info"><i class="fas fa-info-circle"></i> You will be automatically assigned as the salesperson for this customer.</div>'),
-            HTML('<h5 class="mb-3">Basic Information</h5>'),
-            Row(
-                Column('company_name', css_class='form-group col-md-6 mb-3'),
-                Column('contact_person_name', css_class='form-group col-md-6 mb-3'),
-            ),
-            'contact_person_position',
-            Row(
-                Column('email', css_class='form-group col-md-6 mb-3'),
-                Column('phone_number', css_class='form-group col-md-6 mb-3'),
-            ),
-            'address',
-            
-            HTML('<h5 class="mb-3 mt-4">Business Information</h5>'),
-            Row(
-                Column('industry', css_class='form-group col-md-6 mb-3'),
-                Column('territory', css_class='form-group col-md-6 mb-3'),
-            ),
-            HTML('<br>'),
-            Submit('submit', 'Add Customer', css_class='btn btn-primary')
-        )
+        self.helper.layout = SALESPERSON_CUSTOMER_FORM_LAYOUT
+    
+    def clean_email(self):
+        return Customer.normalize_email(self.cleaned_data['email'])
     
     def save(self, commit=True):
         customer = super().save(commit=False)
@@ -142,6 +165,24 @@ class SalespersonCustomerForm(forms.ModelForm):
             )
         return customer
 
+DELINQUENCY_RECORD_FORM_LAYOUT = Layout(
+    Row(
+        Column('customer', css_class='col-md-6'),
+        Column('salesperson', css_class='col-md-6'),
+    ),
+    Row(
+        Column('status', css_class='col-md-3'),
+        Column('tin_number', css_class='col-md-3'),
+        Column('amount_due', css_class='col-md-3'),
+        Column('due_date', css_class='col-md-3'),
+    ),
+    Row(
+        Column('last_payment_date', css_class='col-md-4'),
+    ),
+    'remarks',
+    Submit('submit', 'Save Record', css_class='btn btn-primary')
+)
+
 class DelinquencyRecordForm(forms.ModelForm):
     class Meta:
         model = DelinquencyRecord
@@ -154,20 +195,4 @@ class DelinquencyRecordForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.helper = FormHelper()
-        self.helper.layout = Layout(
-            Row(
-                Column('customer', css_class='col-md-6'),
-                Column('salesperson', css_class='col-md-6'),
-            ),
-            Row(
-                Column('status', css_class='col-md-3'),
-                Column('tin_number', css_class='col-md-3'),
-                Column('amount_due', css_class='col-md-3'),
-                Column('due_date', css_class='col-md-3'),
-            ),
-            Row(
-                Column('last_payment_date', css_class='col-md-4'),
-            ),
-            'remarks',
-            Submit('submit', 'Save Record', css_class='btn btn-primary')
-        )
+        self.helper.layout = DELINQUENCY_RECORD_FORM_LAYOUT
@@ -23,7 +23,7 @@ class Command(BaseCommand):
         
         # Get the first customer
         try:
-            customer = Customer.objects.first()
+            customer = Customer.objects.select_related('salesperson').first()
             if not customer:
                 self.stdout.write(self.style.WARNING('No customers found'))
                 return
@@ -56,7 +56,7 @@ class Command(BaseCommand):
         
         # Test listing backups
         try:
-            all_backups = CustomerBackup.objects.filter(customer=customer)
+            all_backups = CustomerBackup.objects.filter(customer=customer).select_related('changed_by', 'customer')
             self.stdout.write(self.style.SUCCESS(f'✅ Customer has {all_backups.count()} backups'))
             
             for backup in all_backups[:3]:  # Show first 3 backups
@@ -88,9 +88,10 @@ class Command(BaseCommand):
         
         # Final statistics
         try:
-            total_customers = Customer.objects.count()
-            total_backups = CustomerBackup.objects.count()
-            customers_with_backups = Customer.objects.filter(backups__isnull=False).distinct().count()
+            stats = CustomerBackup.coverage_stats()
+            total_customers = stats['total_customers']
+            total_backups = stats['total_backups']
+            customers_with_backups = stats['customers_with_backups']
             
             self.stdout.write(self.style.SUCCESS('\n📊 BACKUP SYSTEM STATISTICS:'))
             self.stdout.write(f'Total customers: {total_customers}')
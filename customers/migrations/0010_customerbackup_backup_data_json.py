@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-16 21:10
+
+import json
+
+from django.db import migrations, models
+
+
+def decode_backup_data(apps, schema_editor):
+    CustomerBackup = apps.get_model('customers', 'CustomerBackup')
+    for backup in CustomerBackup.objects.only('id', 'backup_data').iterator():
+        try:
+            data = json.loads(backup.backup_data)
+        except (TypeError, ValueError):
+            data = {}
+        CustomerBackup.objects.filter(pk=backup.pk).update(backup_data_json=data)
+
+
+def encode_backup_data(apps, schema_editor):
+    CustomerBackup = apps.get_model('customers', 'CustomerBackup')
+    for backup in CustomerBackup.objects.only('id', 'backup_data_json').iterator():
+        CustomerBackup.objects.filter(pk=backup.pk).update(backup_data=json.dumps(backup.backup_data_json))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0009_alter_customerhistory_action'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerbackup',
+            name='backup_data_json',
+            field=models.JSONField(default=dict, help_text='JSON data containing the customer state at backup time'),
+        ),
+        migrations.AlterField(
+            model_name='customerbackup',
+            name='backup_data',
+            field=models.TextField(blank=True, help_text='JSON data containing the customer state at backup time'),
+        ),
+        migrations.RunPython(decode_backup_data, encode_backup_data),
+        migrations.RemoveField(
+            model_name='customerbackup',
+            name='backup_data',
+        ),
+        migrations.RenameField(
+            model_name='customerbackup',
+            old_name='backup_data_json',
+            new_name='backup_data',
+        ),
+    ]
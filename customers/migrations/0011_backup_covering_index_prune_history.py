@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0010_customerbackup_backup_data_json'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customerbackup',
+            name='customers_c_custome_ab8dd7_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='customerhistory',
+            name='customers_c_salespe_90cc57_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='customerhistory',
+            name='customers_c_changed_5eb4cf_idx',
+        ),
+        migrations.AddIndex(
+            model_name='customerbackup',
+            index=models.Index(fields=['customer', '-created_at'], include=('reason', 'changed_by'), name='cb_cov_idx'),
+        ),
+    ]
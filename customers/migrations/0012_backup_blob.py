@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:05
+
+import hashlib
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_backup_data_to_blobs(apps, schema_editor):
+    BackupBlob = apps.get_model('customers', 'BackupBlob')
+    CustomerBackup = apps.get_model('customers', 'CustomerBackup')
+    for backup in CustomerBackup.objects.only('id', 'backup_data').iterator():
+        payload = json.dumps(
+            backup.backup_data or {}, sort_keys=True, separators=(',', ':'), ensure_ascii=False
+        ).encode('utf-8')
+        sha256 = hashlib.sha256(payload).hexdigest()
+        BackupBlob.objects.bulk_create(
+            [BackupBlob(sha256=sha256, data=zlib.compress(payload))], ignore_conflicts=True
+        )
+        CustomerBackup.objects.filter(pk=backup.pk).update(blob_id=sha256)
+
+
+def move_blobs_to_backup_data(apps, schema_editor):
+    CustomerBackup = apps.get_model('customers', 'CustomerBackup')
+    for backup in CustomerBackup.objects.select_related('blob').iterator():
+        data = json.loads(zlib.decompress(bytes(backup.blob.data)))
+        CustomerBackup.objects.filter(pk=backup.pk).update(backup_data=data)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0011_backup_covering_index_prune_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackupBlob',
+            fields=[
+                ('sha256', models.CharField(help_text='SHA-256 hex digest of the canonical JSON payload', max_length=64, primary_key=True, serialize=False)),
+                ('data', models.BinaryField(help_text='zlib-compressed canonical JSON payload')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='customerbackup',
+            name='blob',
+            field=models.ForeignKey(help_text='Deduplicated customer state at backup time', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='backups', to='customers.backupblob'),
+        ),
+        migrations.RunPython(move_backup_data_to_blobs, move_blobs_to_backup_data),
+        migrations.RemoveField(
+            model_name='customerbackup',
+            name='backup_data',
+        ),
+        migrations.AlterField(
+            model_name='customerbackup',
+            name='blob',
+            field=models.ForeignKey(help_text='Deduplicated customer state at backup time', on_delete=django.db.models.deletion.PROTECT, related_name='backups', to='customers.backupblob'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:40
+
+import sys
+
+from django.db import migrations
+
+
+def normalize_emails(apps, schema_editor):
+    Customer = apps.get_model('customers', 'Customer')
+    taken = set(Customer.objects.values_list('email', flat=True))
+    conflicts = []
+    for pk, email in Customer.objects.values_list('pk', 'email').iterator():
+        normalized = email.strip().lower()
+        if normalized == email:
+            continue
+        if normalized in taken:
+            # Leave case-variant duplicates alone rather than violate the unique constraint
+            conflicts.append((pk, email, normalized))
+            continue
+        Customer.objects.filter(pk=pk).update(email=normalized)
+        taken.add(normalized)
+    
+    if conflicts:
+        # These rows fail the forms' unique check on the normalized email until
+        # they are merged with (or moved off) the customer that owns it
+        lines = [
+            f'  customer {pk}: {email!r} clashes with {normalized!r}'
+            for pk, email, normalized in conflicts
+        ]
+        sys.stdout.write(
+            '\n  Customers left with mixed-case emails that need merging:\n'
+            + '\n'.join(lines) + '\n'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0012_backup_blob'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0013_normalize_customer_emails'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='customers_c_is_vip_72cf8e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['-is_vip', '-created_at'], name='cust_vip_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['salesperson', '-is_vip', '-created_at'], name='cust_sp_vip_created_idx'),
+        ),
+    ]
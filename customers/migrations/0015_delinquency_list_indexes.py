@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-16 21:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0014_customer_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='delinquencyrecord',
+            name='customers_d_status_552a97_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='delinquencyrecord',
+            name='customers_d_salespe_1d1f36_idx',
+        ),
+        migrations.AddIndex(
+            model_name='delinquencyrecord',
+            index=models.Index(condition=models.Q(('status__in', ['open', 'watch'])), fields=['due_date'], name='delq_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='delinquencyrecord',
+            index=models.Index(fields=['status', 'due_date'], name='delq_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='delinquencyrecord',
+            index=models.Index(fields=['salesperson', 'status', 'due_date'], name='delq_sp_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:20
+
+from django.db import migrations
+
+# customer_list and delinquent_list search with icontains, which PostgreSQL runs
+# as UPPER(col::text) LIKE UPPER('%term%'); trigram GIN indexes on those same
+# expressions let it answer the unanchored LIKE without a sequential scan.
+SEARCH_COLUMNS = {
+    'cust_company_trgm_idx': 'company_name',
+    'cust_contact_trgm_idx': 'contact_person_name',
+    'cust_email_trgm_idx': 'email',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in SEARCH_COLUMNS.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON customers_customer '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0015_delinquency_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -1,6 +1,26 @@
-from django.db import models
-from users.models import User
+import hashlib
 import json
+import zlib
+
+try:
+    import orjson
+except ImportError:  # optional C encoder, listed in requirements-prod.txt
+    orjson = None
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.forms.models import model_to_dict
+from django.utils import timezone
+from users.models import User
+
+# Customer fields captured verbatim in every backup snapshot
+BACKUP_FIELDS = (
+    'company_name', 'contact_person_name', 'contact_person_position', 'email', 'phone_number',
+    'address', 'industry', 'territory', 'is_vip', 'is_active',
+)
+
+# Customer.display_status labels indexed by (is_vip << 1) | is_active
+DISPLAY_STATUSES = ('Inactive', 'Active', 'VIP Inactive', 'VIP Active')
 
 class Customer(models.Model):
     INDUSTRY_CHOICES = [
@@ -51,6 +71,10 @@ class Customer(models.Model):
 		('outsidencr','Outside NCR'),
     ]
     
+    # Choice labels keyed by value, built once for the display properties
+    INDUSTRY_LABELS = dict(INDUSTRY_CHOICES)
+    TERRITORY_LABELS = dict(TERRITORY_CHOICES)
+    
     # Basic Information
     company_name = models.CharField(max_length=100)
     contact_person_name = models.CharField(max_length=100)
@@ -105,7 +129,10 @@ class Customer(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['is_vip']),
+            # Match customer_list's ORDER BY, overall and per salesperson; the first
+            # also serves is_vip filters, so it replaces the single-column index
+            models.Index(fields=['-is_vip', '-created_at'], name='cust_vip_created_idx'),
+            models.Index(fields=['salesperson', '-is_vip', '-created_at'], name='cust_sp_vip_created_idx'),
             models.Index(fields=['is_active']),
             models.Index(fields=['industry']),
             models.Index(fields=['territory']),
@@ -123,45 +150,88 @@ class Customer(models.Model):
             name += f" [{', '.join(status_indicators)}]"
         return name
     
+    @staticmethod
+    def normalize_email(email):
+        """Return the canonical stored form of a customer email"""
+        return (email or '').strip().lower()
+    
+    def save(self, *args, **kwargs):
+        # Stored emails are canonical, so exact lookups on the unique index are case-insensitive
+        self.email = self.normalize_email(self.email)
+        super().save(*args, **kwargs)
+    
     @property
     def full_name(self):
         return f"{self.company_name} ({self.contact_person_name})"
     
+    @property
+    def industry_display(self):
+        """Industry label; same result as get_industry_display() without rebuilding the choices dict"""
+        return self.INDUSTRY_LABELS.get(self.industry, self.industry)
+    
+    @property
+    def territory_display(self):
+        """Territory label; same result as get_territory_display() without rebuilding the choices dict"""
+        return self.TERRITORY_LABELS.get(self.territory, self.territory)
+    
     @property
     def display_status(self):
         """Return a human-readable status string"""
-        if self.is_vip and self.is_active:
-            return "VIP Active"
-        elif self.is_vip and not self.is_active:
-            return "VIP Inactive"
-        elif not self.is_vip and self.is_active:
-            return "Active"
-        else:
-            return "Inactive"
+        return DISPLAY_STATUSES[(self.is_vip << 1) | self.is_active]
     
-    def create_backup(self, changed_by, reason="Manual backup"):
-        """Create a backup of the current customer state"""
-        backup_data = {
-            'company_name': self.company_name,
-            'contact_person_name': self.contact_person_name,
-            'contact_person_position': self.contact_person_position,
-            'email': self.email,
-            'phone_number': self.phone_number,
-            'address': self.address,
-            'industry': self.industry,
-            'territory': self.territory,
-            'is_vip': self.is_vip,
-            'is_active': self.is_active,
-            'salesperson_id': self.salesperson.id if self.salesperson else None,
-            'salesperson_username': self.salesperson.username if self.salesperson else None,
-        }
+    def build_backup(self, changed_by, reason="Manual backup"):
+        """Return an unsaved backup of the current customer state"""
+        backup_data = model_to_dict(self, fields=BACKUP_FIELDS)
+        backup_data['salesperson_id'] = self.salesperson_id
+        backup_data['salesperson_username'] = self.salesperson.username if self.salesperson_id else None
         
-        return CustomerBackup.objects.create(
+        return CustomerBackup(
             customer=self,
-            backup_data=json.dumps(backup_data),
+            backup_data=backup_data,
             changed_by=changed_by,
             reason=reason
         )
+    
+    def create_backup(self, changed_by, reason="Manual backup"):
+        """Create a backup of the current customer state"""
+        backup = self.build_backup(changed_by, reason)
+        backup.save()
+        return backup
+
+
+# Rows per INSERT when logging history entries in bulk
+HISTORY_BATCH_SIZE = 500
+
+# Badge styling for CustomerHistory actions, shared by every history row
+ACTION_ICONS = {
+    'created': 'fas fa-plus-circle text-success',
+    'updated': 'fas fa-edit text-primary',
+    'vip_enabled': 'fas fa-star text-warning',
+    'vip_disabled': 'far fa-star text-muted',
+    'activated': 'fas fa-toggle-on text-success',
+    'deactivated': 'fas fa-toggle-off text-danger',
+    'salesperson_assigned': 'fas fa-user-plus text-info',
+    'salesperson_changed': 'fas fa-user-edit text-warning',
+    'salesperson_removed': 'fas fa-user-minus text-secondary',
+    'restored': 'fas fa-undo text-info',
+    'imported': 'fas fa-file-import text-primary',
+    'field_updated': 'fas fa-pencil-alt text-secondary',
+}
+
+ACTION_COLORS = {
+    'created': 'success',
+    'updated': 'primary',
+    'vip_enabled': 'warning',
+    'vip_disabled': 'secondary',
+    'activated': 'success',
+    'deactivated': 'danger',
+    'salesperson_assigned': 'info',
+    'salesperson_changed': 'warning',
+    'salesperson_removed': 'secondary',
+    'restored': 'info',
+    'imported': 'primary',
+    'field_updated': 'secondary',
+}
 
 
 class CustomerHistory(models.Model):
@@ -254,18 +324,84 @@ class CustomerHistory(models.Model):
         indexes = [
             models.Index(fields=['customer', '-timestamp']),
             models.Index(fields=['action', '-timestamp']),
-            models.Index(fields=['salesperson_at_time', '-timestamp']),
-            models.Index(fields=['changed_by', '-timestamp']),
         ]
         verbose_name = 'Customer History'
         verbose_name_plural = 'Customer Histories'
 
+    def __str__(self):
+        return f"{self.customer.company_name} - {self.get_action_display()} - {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+    
+    @property
+    def action_icon(self):
+        """Return FontAwesome icon for the action"""
+        return ACTION_ICONS.get(self.action, 'fas fa-circle text-secondary')
+    
+    @property
+    def action_color(self):
+        """Return Bootstrap color class for the action"""
+        return ACTION_COLORS.get(self.action, 'secondary')
+    
+    @staticmethod
+    def changed_values(old_value, new_value):
+        """Drop keys whose value is the same on both sides, returning (old, new)"""
+        if not isinstance(old_value, dict) or not isinstance(new_value, dict):
+            return old_value, new_value
+        changed = {
+            key for key in old_value.keys() | new_value.keys()
+            if key not in old_value or key not in new_value or old_value[key] != new_value[key]
+        }
+        old_changed = {key: value for key, value in old_value.items() if key in changed}
+        new_changed = {key: value for key, value in new_value.items() if key in changed}
+        return old_changed or None, new_changed or None
+    
+    @classmethod
+    def build_customer_change(cls, customer, action, description, changed_by=None,
+                              old_value=None, new_value=None, request=None):
+        """Return an unsaved history entry for a customer change"""
+        # Only the fields that actually changed are stored
+        old_value, new_value = cls.changed_values(old_value, new_value)
+        history_entry = cls(
+            customer=customer,
+            action=action,
+            description=description,
+            changed_by=changed_by,
+            salesperson_at_time_id=customer.salesperson_id,
+            old_value=old_value,
+            new_value=new_value
+        )
+        
+        # Extract request info if available
+        if request:
+            history_entry.ip_address = request.META.get('REMOTE_ADDR')
+            history_entry.user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]  # Truncate if too long
+        
+        return history_entry
+    
+    @classmethod
+    def log_customer_change(cls, customer, action, description, changed_by=None, 
+                           old_value=None, new_value=None, request=None):
+        """Convenience method to log a customer change"""
+        history_entry = cls.build_customer_change(
+            customer, action, description, changed_by=changed_by,
+            old_value=old_value, new_value=new_value, request=request
+        )
+        history_entry.save()
+        return history_entry
+    
+    @classmethod
+    def log_customer_changes(cls, history_entries):
+        """Insert unsaved history entries in batches, e.g. after a CSV import"""
+        return cls.objects.bulk_create(history_entries, batch_size=HISTORY_BATCH_SIZE)
+
 class DelinquencyRecord(models.Model):
     STATUS_CHOICES = [
         ('open', 'Open'),
         ('resolved', 'Resolved'),
         ('watch', 'Watch List'),
     ]
+    # Status labels keyed by value, built once for CSV exports
+    STATUS_LABELS = dict(STATUS_CHOICES)
+    
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='delinquency_records')
     salesperson = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, limit_choices_to={'role': 'salesperson'}, related_name='delinquency_customers')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
@@ -281,76 +417,59 @@ class DelinquencyRecord(models.Model):
     class Meta:
         ordering = ['-updated_at']
         indexes = [
-            models.Index(fields=['status']),
+            # delinquent_list shows open/watch records by due date; the partial index
+            # holds just those rows in that order, the composites serve status filters
+            models.Index(
+                fields=['due_date'],
+                condition=models.Q(status__in=['open', 'watch']),
+                name='delq_open_due_idx',
+            ),
+            models.Index(fields=['status', 'due_date'], name='delq_status_due_idx'),
+            models.Index(fields=['salesperson', 'status', 'due_date'], name='delq_sp_status_due_idx'),
             models.Index(fields=['due_date']),
-            models.Index(fields=['salesperson']),
         ]
 
     def __str__(self):
         return f"{self.customer.company_name} - {self.get_status_display()} ₱{self.amount_due}"
+
+
+class BackupBlob(models.Model):
+    """Compressed backup payload, shared by every backup with identical content"""
+    sha256 = models.CharField(
+        max_length=64,
+        primary_key=True,
+        help_text='SHA-256 hex digest of the canonical JSON payload'
+    )
+    data = models.BinaryField(
+        help_text='zlib-compressed canonical JSON payload'
+    )
     
     def __str__(self):
-        return f"{self.customer.company_name} - {self.get_action_display()} - {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+        return self.sha256[:12]
     
-    @property
-    def action_icon(self):
-        """Return FontAwesome icon for the action"""
-        icons = {
-            'created': 'fas fa-plus-circle text-success',
-            'updated': 'fas fa-edit text-primary',
-            'vip_enabled': 'fas fa-star text-warning',
-            'vip_disabled': 'far fa-star text-muted',
-            'activated': 'fas fa-toggle-on text-success',
-            'deactivated': 'fas fa-toggle-off text-danger',
-            'salesperson_assigned': 'fas fa-user-plus text-info',
-            'salesperson_changed': 'fas fa-user-edit text-warning',
-            'salesperson_removed': 'fas fa-user-minus text-secondary',
-            'restored': 'fas fa-undo text-info',
-            'imported': 'fas fa-file-import text-primary',
-            'field_updated': 'fas fa-pencil-alt text-secondary',
-        }
-        return icons.get(self.action, 'fas fa-circle text-secondary')
+    @staticmethod
+    def encode(backup_data):
+        """Return the canonical JSON bytes for backup data"""
+        # Both encoders emit identical bytes, so content hashes don't depend on orjson
+        if orjson is not None:
+            return orjson.dumps(backup_data, option=orjson.OPT_SORT_KEYS)
+        return json.dumps(backup_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
     
-    @property
-    def action_color(self):
-        """Return Bootstrap color class for the action"""
-        colors = {
-            'created': 'success',
-            'updated': 'primary',
-            'vip_enabled': 'warning',
-            'vip_disabled': 'secondary',
-            'activated': 'success',
-            'deactivated': 'danger',
-            'salesperson_assigned': 'info',
-            'salesperson_changed': 'warning',
-            'salesperson_removed': 'secondary',
-            'restored': 'info',
-            'imported': 'primary',
-            'field_updated': 'secondary',
-        }
-        return colors.get(self.action, 'secondary')
+    @classmethod
+    def from_data(cls, backup_data):
+        """Return an unsaved blob keyed by the content hash of the data"""
+        payload = cls.encode(backup_data)
+        return cls(sha256=hashlib.sha256(payload).hexdigest(), data=zlib.compress(payload))
     
     @classmethod
-    def log_customer_change(cls, customer, action, description, changed_by=None, 
-                           old_value=None, new_value=None, request=None):
-        """Convenience method to log a customer change"""
-        history_entry = cls(
-            customer=customer,
-            action=action,
-            description=description,
-            changed_by=changed_by,
-            salesperson_at_time=customer.salesperson,
-            old_value=old_value,
-            new_value=new_value
-        )
-        
-        # Extract request info if available
-        if request:
-            history_entry.ip_address = request.META.get('REMOTE_ADDR')
-            history_entry.user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]  # Truncate if too long
-        
-        history_entry.save()
-        return history_entry
+    def store(cls, blobs):
+        """Insert blobs, skipping content that is already stored"""
+        cls.objects.bulk_create(blobs, ignore_conflicts=True)
+    
+    def load(self):
+        """Return the stored backup data as a Python dictionary"""
+        payload = zlib.decompress(bytes(self.data))
+        return orjson.loads(payload) if orjson is not None else json.loads(payload)
 
 
 class CustomerBackup(models.Model):
@@ -361,8 +480,11 @@ class CustomerBackup(models.Model):
         related_name='backups',
         help_text='The customer this backup belongs to'
     )
-    backup_data = models.TextField(
-        help_text='JSON data containing the customer state at backup time'
+    blob = models.ForeignKey(
+        BackupBlob,
+        on_delete=models.PROTECT,
+        related_name='backups',
+        help_text='Deduplicated customer state at backup time'
     )
     changed_by = models.ForeignKey(
         User,
@@ -383,7 +505,13 @@ class CustomerBackup(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['customer', '-created_at']),
+            # INCLUDE lets PostgreSQL answer backup listings from the index alone;
+            # other backends create a plain (customer, -created_at) index.
+            models.Index(
+                fields=['customer', '-created_at'],
+                include=['reason', 'changed_by'],
+                name='cb_cov_idx',
+            ),
         ]
         verbose_name = 'Customer Backup'
         verbose_name_plural = 'Customer Backups'
@@ -391,12 +519,41 @@ class CustomerBackup(models.Model):
     def __str__(self):
         return f"Backup of {self.customer.company_name} - {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
     
+    @property
+    def backup_data(self):
+        """Customer state stored in this backup's blob"""
+        if not hasattr(self, '_backup_data'):
+            self._backup_data = self.blob.load() if self.blob_id else {}
+        return self._backup_data
+    
+    @backup_data.setter
+    def backup_data(self, value):
+        self.blob = self._pending_blob = BackupBlob.from_data(value)
+        self._backup_data = value
+    
+    def save(self, *args, **kwargs):
+        # Blobs are content-addressed, so storing one that already exists is a no-op
+        pending_blob = self.__dict__.pop('_pending_blob', None)
+        if pending_blob is not None:
+            BackupBlob.store([pending_blob])
+        super().save(*args, **kwargs)
+    
     def get_backup_data(self):
         """Return the backup data as a Python dictionary"""
-        try:
-            return json.loads(self.backup_data)
-        except json.JSONDecodeError:
-            return {}
+        return self.backup_data or {}
+    
+    @classmethod
+    def coverage_stats(cls):
+        """Return customer, backup and backed-up customer counts"""
+        # EXISTS stops at the first backup per customer, avoiding a join + DISTINCT
+        stats = Customer.objects.aggregate(
+            total_customers=models.Count('id'),
+            customers_with_backups=models.Count(
+                'id', filter=models.Q(models.Exists(cls.objects.filter(customer=models.OuterRef('pk'))))
+            ),
+        )
+        stats['total_backups'] = cls.objects.count()
+        return stats
     
     def restore(self, restored_by):
         """Restore the customer to this backup state"""
@@ -404,34 +561,48 @@ class CustomerBackup(models.Model):
         if not backup_data:
             raise ValueError("Invalid backup data")
         
-        # Create a backup of current state before restoring
-        self.customer.create_backup(
-            changed_by=restored_by,
-            reason=f"Before restore from backup {self.id}"
-        )
-        
-        # Restore the customer data
-        for field, value in backup_data.items():
-            if field == 'salesperson_id' and value:
-                try:
-                    salesperson = User.objects.get(id=value, role='salesperson')
-                    self.customer.salesperson = salesperson
-                except User.DoesNotExist:
-                    # If salesperson doesn't exist anymore, leave as null
-                    self.customer.salesperson = None
-            elif field not in ['salesperson_id', 'salesperson_username']:
-                setattr(self.customer, field, value)
-        
-        self.customer.save()
+        customer = self.customer
+        restorable_fields = set(BACKUP_FIELDS)
         
-        # Create a restoration log entry
-        CustomerBackup.objects.create(
-            customer=self.customer,
-            backup_data=json.dumps({
-                'restored_from_backup_id': self.id,
-                'restored_at': self.created_at.isoformat(),
-                'restored_reason': self.reason
-            }),
-            changed_by=restored_by,
-            reason=f"Restored from backup {self.id}"
-        )
+        with transaction.atomic():
+            # Snapshot the current state before restoring
+            pre_restore_backup = customer.build_backup(
+                changed_by=restored_by,
+                reason=f"Before restore from backup {self.id}"
+            )
+            
+            # Restore the customer data with a single UPDATE
+            restored_fields = {'updated_at': timezone.now()}
+            for field, value in backup_data.items():
+                if field == 'salesperson_id' and value:
+                    # If the salesperson doesn't exist anymore, leave as null
+                    salesperson_exists = User.objects.filter(id=value, role='salesperson').exists()
+                    restored_fields['salesperson_id'] = value if salesperson_exists else None
+                elif field in restorable_fields:
+                    restored_fields[field] = value
+            if 'email' in restored_fields:
+                # update() bypasses save(), and older backups may hold mixed-case emails
+                restored_fields['email'] = Customer.normalize_email(restored_fields['email'])
+            
+            Customer.objects.filter(pk=self.customer_id).update(**restored_fields)
+            
+            # Write the pre-restore snapshot and the restoration log together
+            backups = [
+                pre_restore_backup,
+                CustomerBackup(
+                    customer_id=self.customer_id,
+                    backup_data={
+                        'restored_from_backup_id': self.id,
+                        'restored_at': self.created_at.isoformat(),
+                        'restored_reason': self.reason
+                    },
+                    changed_by=restored_by,
+                    reason=f"Restored from backup {self.id}"
+                ),
+            ]
+            BackupBlob.store([backup.blob for backup in backups])
+            CustomerBackup.objects.bulk_create(backups)
+            
+            # update() and bulk_create() send no post_save, so drop the overview cache here
+            from .signals import BACKUP_OVERVIEW_CACHE_KEY
+            transaction.on_commit(lambda: cache.delete(BACKUP_OVERVIEW_CACHE_KEY))
@@ -0,0 +1,16 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Customer, CustomerBackup
+
+# Cached backup_overview coverage stats and most-backed-up customers
+BACKUP_OVERVIEW_CACHE_KEY = 'customers:backup_overview'
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+@receiver(post_save, sender=CustomerBackup)
+@receiver(post_delete, sender=CustomerBackup)
+def invalidate_backup_overview(sender, **kwargs):
+    # Bulk imports skip signals; the cache timeout bounds how stale that leaves it.
+    # CustomerBackup.restore() clears the key itself.
+    cache.delete(BACKUP_OVERVIEW_CACHE_KEY)
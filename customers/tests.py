@@ -1,3 +1,520 @@
+import codecs
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from users.models import User
+from teams.models import Group, Team, TeamMembership
+from .forms import CustomerForm, SalespersonCustomerForm
+from .views import CUSTOMERS_PER_PAGE, INDUSTRY_IMPORT_LOOKUP, decode_csv_upload, match_choice
+from .models import BackupBlob, Customer, CustomerBackup, CustomerHistory, DelinquencyRecord
+
+class CustomerFormSalespersonChoicesTests(TestCase):
+    def setUp(self):
+        self.sp = User.objects.create_user(username='sp1', password='pass', role='salesperson')
+        User.objects.create_user(username='sup1', password='pass', role='supervisor')
+
+    def test_choices_list_active_salespeople(self):
+        form = CustomerForm()
+        self.assertEqual(
+            list(form.fields['salesperson'].choices),
+            [('', form.fields['salesperson'].empty_label), (self.sp.id, 'sp1')],
+        )
+
+    def test_choices_read_once_per_form_and_follow_user_changes(self):
+        with self.assertNumQueries(1):
+            form = CustomerForm()
+            str(form['salesperson'])
+        User.objects.create_user(username='sp2', password='pass', role='salesperson')
+        self.sp.is_active = False
+        self.sp.save()
+        usernames = [label for _, label in CustomerForm().fields['salesperson'].choices]
+        self.assertEqual(usernames[1:], ['sp2'])
+
+    def test_bound_form_validates_salesperson(self):
+        form = CustomerForm(data={
+            'company_name': 'Acme',
+            'contact_person_name': 'Jane',
+            'email': 'jane@acme.test',
+            'is_active': True,
+            'salesperson': self.sp.id,
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['salesperson'], self.sp)
+
+    def test_email_is_normalized_and_case_duplicates_rejected(self):
+        Customer.objects.create(company_name='Acme', contact_person_name='Jane', email=' Jane@Acme.TEST ')
+        self.assertTrue(Customer.objects.filter(email='jane@acme.test').exists())
+        form = CustomerForm(data={
+            'company_name': 'Acme 2',
+            'contact_person_name': 'Jane',
+            'email': 'JANE@acme.test',
+            'is_active': True,
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('email', form.errors)
+
+class CustomerBackupRestoreTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        self.sp1 = User.objects.create_user(username='sp1', password='pass', role='salesperson')
+        self.sp2 = User.objects.create_user(username='sp2', password='pass', role='salesperson')
+        self.customer = Customer.objects.create(
+            company_name='Acme',
+            contact_person_name='Jane',
+            email='jane@acme.test',
+            salesperson=self.sp1,
+        )
+
+    def test_restore_reverts_fields_and_logs_backups(self):
+        backup = self.customer.create_backup(changed_by=self.admin)
+        self.customer.company_name = 'Acme Renamed'
+        self.customer.is_vip = True
+        self.customer.salesperson = self.sp2
+        self.customer.save()
+
+        backup.restore(restored_by=self.admin)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.company_name, 'Acme')
+        self.assertFalse(self.customer.is_vip)
+        self.assertEqual(self.customer.salesperson, self.sp1)
+
+        latest, pre_restore = CustomerBackup.objects.filter(customer=self.customer).order_by('-created_at', '-id')[:2]
+        self.assertEqual(latest.reason, f'Restored from backup {backup.id}')
+        self.assertEqual(latest.get_backup_data()['restored_from_backup_id'], backup.id)
+        self.assertEqual(pre_restore.reason, f'Before restore from backup {backup.id}')
+        self.assertEqual(pre_restore.get_backup_data()['company_name'], 'Acme Renamed')
+        self.assertEqual(pre_restore.get_backup_data()['salesperson_id'], self.sp2.id)
+
+    def test_restore_normalizes_email_from_older_backups(self):
+        Customer.objects.filter(pk=self.customer.pk).update(email='Jane@Acme.TEST')
+        self.customer.refresh_from_db()
+        backup = self.customer.create_backup(changed_by=self.admin)
+        self.customer.email = 'jane@acme.example'
+        self.customer.save()
+
+        backup.restore(restored_by=self.admin)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.email, 'jane@acme.test')
+
+    def test_coverage_stats(self):
+        Customer.objects.create(company_name='Globex', contact_person_name='Hank', email='hank@globex.test')
+        self.customer.create_backup(changed_by=self.admin)
+        self.customer.create_backup(changed_by=self.admin, reason='Again')
+        self.assertEqual(
+            CustomerBackup.coverage_stats(),
+            {'total_customers': 2, 'customers_with_backups': 1, 'total_backups': 2},
+        )
+
+    def test_backup_overview_ranks_only_backed_up_customers(self):
+        globex = Customer.objects.create(company_name='Globex', contact_person_name='Hank', email='hank@globex.test')
+        Customer.objects.create(company_name='Initech', contact_person_name='Bill', email='bill@initech.test')
+        self.customer.create_backup(changed_by=self.admin)
+        globex.create_backup(changed_by=self.admin)
+        globex.create_backup(changed_by=self.admin, reason='Again')
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('backup_overview'))
+        self.assertEqual(
+            [(c.company_name, c.backup_count) for c in response.context['customers_by_backup_count']],
+            [('Globex', 2), ('Acme', 1)],
+        )
+        self.assertEqual(response.context['stats']['customers_without_backups'], 1)
+
+    def test_edit_customer_backs_up_only_real_changes(self):
+        self.client.force_login(self.admin)
+        url = reverse('edit_customer', args=[self.customer.pk])
+        data = {
+            'company_name': 'Acme', 'contact_person_name': 'Jane', 'email': 'jane@acme.test',
+            'is_active': 'on', 'salesperson': self.sp1.pk,
+        }
+        self.client.post(url, data)
+        self.assertFalse(CustomerBackup.objects.exists())
+
+        self.client.post(url, {**data, 'company_name': 'Acme Renamed'})
+        backup = CustomerBackup.objects.get()
+        self.assertEqual(backup.reason, 'Before admin edit: company_name')
+        self.assertEqual(backup.get_backup_data()['company_name'], 'Acme')
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.company_name, 'Acme Renamed')
+
+    def test_backup_listings_avoid_per_row_queries(self):
+        self.client.force_login(self.admin)
+        urls = [
+            reverse('edit_customer', args=[self.customer.pk]),
+            reverse('customer_backups', args=[self.customer.pk]),
+            reverse('backup_overview'),
+        ]
+        self.customer.create_backup(changed_by=self.admin)
+        for url in urls:
+            self.assertContains(self.client.get(url), 'Manual backup')
+        baseline = {}
+        for url in urls:
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+            baseline[url] = len(ctx)
+        self.customer.create_backup(changed_by=self.sp1, reason='Again')
+        for url in urls:
+            cache.clear()
+            with self.assertNumQueries(baseline[url]):
+                self.client.get(url)
+
+    def test_backup_overview_caches_summary_until_backups_change(self):
+        self.client.force_login(self.admin)
+        url = reverse('backup_overview')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertFalse(any('GROUP BY' in query['sql'] for query in ctx.captured_queries))
+
+        self.customer.create_backup(changed_by=self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.context['stats']['total_backups'], 1)
+        self.assertEqual(
+            [(c.company_name, c.backup_count) for c in response.context['customers_by_backup_count']],
+            [('Acme', 1)],
+        )
+
+    def test_restore_refreshes_cached_backup_overview(self):
+        backup = self.customer.create_backup(changed_by=self.admin)
+        self.client.force_login(self.admin)
+        url = reverse('backup_overview')
+        self.assertEqual(self.client.get(url).context['stats']['total_backups'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            backup.restore(restored_by=self.admin)
+        self.assertEqual(self.client.get(url).context['stats']['total_backups'], 3)
+
+    def test_identical_backups_share_one_blob(self):
+        first = self.customer.create_backup(changed_by=self.admin)
+        second = self.customer.create_backup(changed_by=self.admin, reason='Again')
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(BackupBlob.objects.count(), 1)
+        self.assertEqual(CustomerBackup.objects.get(pk=second.pk).get_backup_data()['email'], 'jane@acme.test')
+
+class CustomerDisplayLabelTests(TestCase):
+    def test_labels_match_get_display(self):
+        for industry, _ in Customer.INDUSTRY_CHOICES + [('', ''), ('unknown', '')]:
+            customer = Customer(industry=industry)
+            self.assertEqual(customer.industry_display, customer.get_industry_display())
+        for territory, _ in Customer.TERRITORY_CHOICES + [('', '')]:
+            customer = Customer(territory=territory)
+            self.assertEqual(customer.territory_display, customer.get_territory_display())
+
+    def test_display_status(self):
+        expected = {
+            (False, False): 'Inactive',
+            (False, True): 'Active',
+            (True, False): 'VIP Inactive',
+            (True, True): 'VIP Active',
+        }
+        for (is_vip, is_active), label in expected.items():
+            self.assertEqual(Customer(is_vip=is_vip, is_active=is_active).display_status, label)
+
+class SalespersonCustomerFormTests(TestCase):
+    def test_save_logs_creation_history(self):
+        sp = User.objects.create_user(username='sp1', password='pass', role='salesperson')
+        form = SalespersonCustomerForm(
+            data={'company_name': 'Acme', 'contact_person_name': 'Jane', 'email': 'jane@acme.test'},
+            salesperson=sp,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        customer = form.save()
+        entry = CustomerHistory.objects.get(customer=customer)
+        self.assertEqual(entry.action, 'created')
+        self.assertEqual(entry.salesperson_at_time, sp)
+        self.assertEqual(entry.action_color, 'success')
+        self.assertEqual(entry.action_icon, 'fas fa-plus-circle text-success')
+
+class ImportCustomersTests(TestCase):
+    def test_import_logs_history_for_each_customer(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        self.client.force_login(admin)
+        csv_file = SimpleUploadedFile('customers.csv', (
+            'Company Name,Contact Person,Position,Email,Phone\n'
+            'Acme,Jane,CEO,jane@acme.test,123\n'
+            'Globex,Hank,CTO,hank@globex.test,456\n'
+        ).encode(), content_type='text/csv')
+        self.client.post(reverse('import_customers'), {'csv_file': csv_file})
+        self.assertEqual(Customer.objects.count(), 2)
+        self.assertEqual(
+            sorted(CustomerHistory.objects.filter(action='imported').values_list('customer__company_name', flat=True)),
+            ['Acme', 'Globex'],
+        )
+
+    def test_import_skips_existing_and_in_file_duplicate_emails(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        User.objects.create_user(username='sp1', password='pass', role='salesperson', initials='SP')
+        Customer.objects.create(company_name='Old', contact_person_name='Ann', email='ann@old.test')
+        self.client.force_login(admin)
+        csv_file = SimpleUploadedFile('customers.csv', (
+            'Company Name,Contact Person,Position,Email,Phone,Address,Industry,Territory,VIP,Active,Salesperson\n'
+            'Old,Ann,CEO,ANN@old.test,123,,,,No,Yes,\n'
+            'Acme,Jane,CEO,jane@acme.test,123,,,,Yes,Yes,SP\n'
+            'Acme Dup,Jane,CEO,Jane@Acme.test,123,,,,No,Yes,\n'
+            'Globex,Hank,CTO,hank@globex.test,456,,,,No,Yes,XX\n'
+        ).encode(), content_type='text/csv')
+        self.client.post(reverse('import_customers'), {'csv_file': csv_file})
+        self.assertEqual(
+            sorted(Customer.objects.values_list('company_name', flat=True)), ['Acme', 'Old']
+        )
+        acme = Customer.objects.get(company_name='Acme')
+        self.assertTrue(acme.is_vip)
+        self.assertEqual(acme.salesperson.username, 'sp1')
+        self.assertEqual(CustomerHistory.objects.get(action='imported').customer, acme)
+
+    def test_import_rejects_ambiguous_salesperson_initials(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        User.objects.create_user(username='sp1', password='pass', role='salesperson', initials='SP')
+        User.objects.create_user(username='sp2', password='pass', role='salesperson', initials='SP')
+        self.client.force_login(admin)
+        csv_file = SimpleUploadedFile('customers.csv', (
+            'Company Name,Contact Person,Position,Email,Phone,Address,Industry,Territory,VIP,Active,Salesperson\n'
+            'Acme,Jane,CEO,jane@acme.test,123,,,,No,Yes,SP\n'
+            'Globex,Hank,CTO,hank@globex.test,456,,,,No,Yes,\n'
+        ).encode(), content_type='text/csv')
+        self.client.post(reverse('import_customers'), {'csv_file': csv_file})
+        self.assertEqual(list(Customer.objects.values_list('company_name', flat=True)), ['Globex'])
+
+    def test_import_reports_rows_that_do_not_fit_their_columns(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        self.client.force_login(admin)
+        csv_file = SimpleUploadedFile('customers.csv', (
+            'Company Name,Contact Person,Position,Email,Phone\n'
+            'Acme,Jane,CEO,jane@acme.test,+63 917 123 4567 ext 1234\n'
+            'Globex,Hank,CTO,hank@globex.test,456\n'
+        ).encode(), content_type='text/csv')
+        response = self.client.post(reverse('import_customers'), {'csv_file': csv_file}, follow=True)
+        self.assertEqual(list(Customer.objects.values_list('company_name', flat=True)), ['Globex'])
+        self.assertIn('Row 2: phone_number:', ' '.join(str(m) for m in response.context['messages']))
+
+    def test_decode_csv_upload_uses_bom_then_fallbacks(self):
+        self.assertEqual(decode_csv_upload('\ufeffname\nJos\u00e9'.encode('utf-8')), 'name\nJos\u00e9')
+        self.assertEqual(decode_csv_upload('name\nJos\u00e9'.encode('utf-16')), 'name\nJos\u00e9')
+        self.assertEqual(decode_csv_upload('Caf\u00e9 \u2013 Bar'.encode('cp1252')), 'Caf\u00e9 \u2013 Bar')
+
+    def test_match_choice_exact_then_partial_label(self):
+        self.assertEqual(match_choice('Automotive', INDUSTRY_IMPORT_LOOKUP), 'automotive')
+        self.assertEqual(match_choice('bpo', INDUSTRY_IMPORT_LOOKUP), 'business')
+        self.assertEqual(match_choice('nonsense', INDUSTRY_IMPORT_LOOKUP), '')
+
+class ImportDelinquenciesTests(TestCase):
+    def test_import_matches_customers_by_email_and_salesperson_by_username(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        sp = User.objects.create_user(username='sp1', password='pass', role='salesperson')
+        acme = Customer.objects.create(company_name='Acme', contact_person_name='Jane', email='jane@acme.test')
+        self.client.force_login(admin)
+        csv_file = SimpleUploadedFile('delinquencies.csv', codecs.BOM_UTF8 + (
+            'company_name,email,contact_person,amount_due,due_date,status,salesperson_username\n'
+            'Acme,JANE@acme.test,Jane,100,2026-01-31,open,sp1\n'
+            'Globex,hank@globex.test,Hank,50,,watch,\n'
+            'Globex,hank@globex.test,Hank,25,,open,nobody\n'
+            'ACME,,Jane,30,,resolved,\n'
+            'Initech,,Bill,40,,open,\n'
+            'initech,,Bill,45,,watch,\n'
+        ).encode(), content_type='text/csv')
+        self.client.post(reverse('import_delinquencies'), {'csv_file': csv_file})
+        self.assertEqual(Customer.objects.count(), 3)
+        self.assertEqual(
+            sorted(DelinquencyRecord.objects.filter(customer=acme).values_list('status', flat=True)),
+            ['open', 'resolved'],
+        )
+        record = DelinquencyRecord.objects.get(customer=acme, status='open')
+        self.assertEqual(record.salesperson, sp)
+        initech = Customer.objects.get(company_name='Initech')
+        self.assertEqual(initech.email, 'unknown_initech@example.com')
+        self.assertEqual(initech.delinquency_records.count(), 2)
+        globex_records = DelinquencyRecord.objects.filter(customer__email='hank@globex.test')
+        self.assertEqual(globex_records.count(), 2)
+        self.assertFalse(globex_records.exclude(salesperson=None).exists())
+
+    def test_import_reads_cr_only_line_endings(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        self.client.force_login(admin)
+        csv_file = SimpleUploadedFile('delinquencies.csv', (
+            'company_name,email,contact_person,amount_due,due_date,status,remarks\r'
+            'Acme,jane@acme.test,Jane,10,,open,"Call\rback"\r'
+        ).encode(), content_type='text/csv')
+        self.client.post(reverse('import_delinquencies'), {'csv_file': csv_file})
+        record = DelinquencyRecord.objects.get(customer__email='jane@acme.test')
+        self.assertEqual(record.remarks, 'Call\rback')
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        self.sp = User.objects.create_user(username='sp1', password='pass', role='salesperson', initials='SP')
+        self.customer = Customer.objects.create(
+            company_name='Acme', contact_person_name='Jane', email='jane@acme.test',
+            territory='makati', salesperson=self.sp,
+        )
+        self.client.force_login(self.admin)
+
+    def test_export_customers_streams_rows(self):
+        response = self.client.get(reverse('export_customers'))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('Acme,Jane,,jane@acme.test'))
+        self.assertIn(',Makati,No,Yes,SP,', lines[1])
+
+    def test_export_delinquencies_falls_back_to_customer_salesperson(self):
+        DelinquencyRecord.objects.create(customer=self.customer, amount_due=100, created_by=self.admin)
+        response = self.client.get(reverse('export_delinquencies'))
+        # Streaming issues only the export query; no per-row lookups of deferred columns
+        with self.assertNumQueries(1):
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(',sp1,admin1,', lines[1])
+        self.assertIn(',Open,100.00,', lines[1])
+
+class ToggleCustomerFlagTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        self.customer = Customer.objects.create(company_name='Acme', contact_person_name='Jane', email='jane@acme.test')
+        self.client.force_login(self.admin)
+
+    def test_toggle_vip_flips_flag_and_logs_history(self):
+        response = self.client.post(reverse('toggle_customer_vip', args=[self.customer.pk]))
+        self.assertEqual(response.json()['is_vip'], True)
+        self.customer.refresh_from_db()
+        self.assertTrue(self.customer.is_vip)
+        entry = CustomerHistory.objects.get(customer=self.customer)
+        self.assertEqual(entry.action, 'vip_enabled')
+        self.assertEqual(entry.old_value, {'is_vip': False})
+
+    def test_toggle_vip_rolls_back_when_history_fails(self):
+        with mock.patch.object(CustomerHistory, 'log_customer_change', side_effect=RuntimeError('boom')):
+            response = self.client.post(reverse('toggle_customer_vip', args=[self.customer.pk]))
+        self.assertFalse(response.json()['success'])
+        self.customer.refresh_from_db()
+        self.assertFalse(self.customer.is_vip)
+
+    def test_toggle_active_twice_restores_flag(self):
+        url = reverse('toggle_customer_active', args=[self.customer.pk])
+        self.assertEqual(self.client.post(url).json()['is_active'], False)
+        self.assertEqual(self.client.post(url).json()['is_active'], True)
+        self.assertEqual(
+            list(CustomerHistory.objects.order_by('id').values_list('action', flat=True)),
+            ['deactivated', 'activated'],
+        )
+
+    def test_toggle_active_rolls_back_when_history_fails(self):
+        with mock.patch.object(CustomerHistory, 'log_customer_change', side_effect=RuntimeError('boom')):
+            response = self.client.post(reverse('toggle_customer_active', args=[self.customer.pk]))
+        self.assertFalse(response.json()['success'])
+        self.customer.refresh_from_db()
+        self.assertTrue(self.customer.is_active)
+
+    def test_toggle_missing_customer_reports_error(self):
+        response = self.client.post(reverse('toggle_customer_vip', args=[self.customer.pk + 1]))
+        self.assertFalse(response.json()['success'])
+
+class CustomerHistoryChangedValuesTests(TestCase):
+    def test_unchanged_keys_are_dropped(self):
+        old, new = CustomerHistory.changed_values(
+            {'company_name': 'Acme', 'is_vip': False, 'email': 'a@acme.test'},
+            {'company_name': 'Acme', 'is_vip': True, 'email': 'a@acme.test', 'territory': 'makati'},
+        )
+        self.assertEqual(old, {'is_vip': False})
+        self.assertEqual(new, {'is_vip': True, 'territory': 'makati'})
+
+    def test_no_changes_store_nothing(self):
+        self.assertEqual(CustomerHistory.changed_values({'is_vip': True}, {'is_vip': True}), (None, None))
+
+    def test_non_dict_values_are_kept(self):
+        self.assertEqual(CustomerHistory.changed_values(None, {'is_vip': True}), (None, {'is_vip': True}))
+
+class CustomerRoleScopingTests(TestCase):
+    def setUp(self):
+        self.avp = User.objects.create_user(username='avp1', password='pass', role='avp')
+        self.asm = User.objects.create_user(username='asm1', password='pass', role='asm')
+        self.supervisor = User.objects.create_user(username='sup1', password='pass', role='supervisor')
+        self.teamlead = User.objects.create_user(username='tl1', password='pass', role='teamlead')
+        self.sp_in = User.objects.create_user(username='sp_in', password='pass', role='salesperson')
+        self.sp_out = User.objects.create_user(username='sp_out', password='pass', role='salesperson')
+        team = Team.objects.create(name='TEAM A', avp=self.avp, asm=self.asm)
+        group = Group.objects.create(
+            name='Group X', team=team, group_type='regular', supervisor=self.supervisor, teamlead=self.teamlead
+        )
+        TeamMembership.objects.create(user=self.sp_in, group=group)
+        self.mine = Customer.objects.create(
+            company_name='Mine', contact_person_name='A', email='a@mine.test', salesperson=self.sp_in
+        )
+        self.other = Customer.objects.create(
+            company_name='Other', contact_person_name='B', email='b@other.test', salesperson=self.sp_out
+        )
+
+    def test_managers_see_only_their_salespeoples_customers(self):
+        for manager in (self.avp, self.asm, self.supervisor, self.teamlead):
+            self.client.force_login(manager)
+            response = self.client.get(reverse('customer_list'))
+            self.assertEqual(list(response.context['customers']), [self.mine], manager.role)
+            self.assertEqual(
+                response.context['stats'],
+                {'total': 1, 'vip_count': 0, 'active_count': 1, 'inactive_count': 0},
+            )
+
+    def test_delinquent_list_scoped_through_customer_salesperson(self):
+        DelinquencyRecord.objects.create(customer=self.mine, amount_due=10)
+        DelinquencyRecord.objects.create(customer=self.other, amount_due=20)
+        self.client.force_login(self.supervisor)
+        response = self.client.get(reverse('delinquent_list'))
+        self.assertEqual([r.customer for r in response.context['records']], [self.mine])
+
+    def test_customer_history_access(self):
+        self.client.force_login(self.asm)
+        self.assertEqual(self.client.get(reverse('customer_history', args=[self.mine.pk])).status_code, 200)
+        self.assertRedirects(
+            self.client.get(reverse('customer_history', args=[self.other.pk])), reverse('customer_list'),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(self.client.get(reverse('customer_history', args=[self.other.pk + 100])).status_code, 404)
+
+    def test_customer_history_stats(self):
+        for action in ('vip_enabled', 'vip_disabled', 'activated', 'salesperson_assigned', 'field_updated', 'created'):
+            CustomerHistory.log_customer_change(customer=self.mine, action=action, description=action)
+        CustomerHistory.log_customer_change(customer=self.other, action='vip_enabled', description='other')
+        self.client.force_login(self.asm)
+        response = self.client.get(reverse('customer_history', args=[self.mine.pk]))
+        self.assertEqual(len(response.context['history']), 6)
+        summary = self.client.get(reverse('customer_history_summary', args=[self.mine.pk])).json()
+        self.assertEqual(summary['history_stats'], {
+            'total_changes': 6, 'vip_changes': 2, 'status_changes': 1,
+            'salesperson_changes': 1, 'field_updates': 1,
+        })
+        self.assertEqual(
+            summary['salespeople_history'],
+            [{'username': 'sp_in', 'first_name': '', 'last_name': '', 'initials': ''}],
+        )
+        self.assertEqual(
+            self.client.get(reverse('customer_history_summary', args=[self.other.pk])).status_code, 404
+        )
+
+class CustomerListPaginationTests(TestCase):
+    def test_pages_keep_filters_and_reuse_stats_count(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        Customer.objects.bulk_create([
+            Customer(company_name=f'Co {i}', contact_person_name='X', email=f'x{i}@co.test', is_vip=True)
+            for i in range(CUSTOMERS_PER_PAGE + 1)
+        ])
+        self.client.force_login(admin)
+        response = self.client.get(reverse('customer_list'), {'vip': 'yes', 'page': 2})
+        page = response.context['customers']
+        self.assertEqual(len(page.object_list), 1)
+        self.assertEqual(page.paginator.count, CUSTOMERS_PER_PAGE + 1)
+        self.assertContains(response, '?vip=yes&amp;page=1')
 
-# Create your tests here.
+    def test_rendering_does_not_load_deferred_columns(self):
+        admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        sp = User.objects.create_user(username='sp1', password='pass', role='salesperson', initials='SP')
+        self.client.force_login(admin)
+        Customer.objects.create(company_name='Acme', contact_person_name='Jane', email='jane@acme.test', salesperson=sp)
+        Customer.objects.create(company_name='Globex', contact_person_name='Hank', email='hank@globex.test')
+        # Session, user, stats aggregate and the page itself; no per-row lookups
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('customer_list'))
+        self.assertContains(response, 'Acme')
@@ -16,6 +16,7 @@ urlpatterns = [
     path('<int:pk>/toggle-vip/', views.toggle_customer_vip, name='toggle_customer_vip'),
     path('<int:pk>/toggle-active/', views.toggle_customer_active, name='toggle_customer_active'),
     path('<int:pk>/history/', views.customer_history, name='customer_history'),
+    path('<int:pk>/history/summary/', views.customer_history_summary, name='customer_history_summary'),
     path('export/', views.export_customers, name='export_customers'),
     path('import/', views.import_customers, name='import_customers'),
     path('sample-csv/', views.download_sample_csv, name='download_sample_csv'),
@@ -1,14 +1,156 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from .models import Customer, CustomerBackup, CustomerHistory, DelinquencyRecord
-from .forms import CustomerForm
+from .forms import CustomerForm, DelinquencyRecordForm, SalespersonCustomerForm
+from .signals import BACKUP_OVERVIEW_CACHE_KEY
 from users.models import User
-from teams.models import Team, Group, TeamMembership
+from django.core.cache import cache
+import codecs
 import csv
 import io
+from decimal import Decimal
+
+# Rows rendered per page on the customer and delinquency lists and the history timeline
+CUSTOMERS_PER_PAGE = 50
+DELINQUENT_RECORDS_PER_PAGE = 50
+HISTORY_ENTRIES_PER_PAGE = 50
+
+# Customers (and delinquency records) inserted per INSERT statement when importing a CSV
+IMPORT_BATCH_SIZE = 500
+
+# Customer CSV columns in export_customers order, with the value used when a row
+# stops short; Created At / Updated At are ignored since they're auto-generated
+CUSTOMER_IMPORT_COLUMNS = (
+    ('company_name', ''),
+    ('contact_person_name', ''),
+    ('contact_person_position', ''),
+    ('email', ''),
+    ('phone_number', ''),
+    ('address', ''),
+    ('industry', ''),
+    ('territory', ''),
+    ('vip_status', 'No'),
+    ('active_status', 'Yes'),
+    ('salesperson_initials', ''),
+)
+CUSTOMER_IMPORT_FIELDS = tuple(field for field, _ in CUSTOMER_IMPORT_COLUMNS)
+CUSTOMER_IMPORT_DEFAULTS = dict(CUSTOMER_IMPORT_COLUMNS)
+# Company name through phone number must be present
+CUSTOMER_IMPORT_MIN_COLUMNS = 5
+IMPORT_TRUE_VALUES = frozenset(('yes', 'true', '1'))
+
+# Rows fetched per database round-trip when streaming CSV exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Seconds backup_overview's coverage stats and top customers stay cached
+BACKUP_OVERVIEW_TIMEOUT = 60
+
+# Backup and author columns shown in backup listings
+BACKUP_LIST_FIELDS = (
+    'created_at', 'reason',
+    'changed_by__username', 'changed_by__first_name', 'changed_by__last_name', 'changed_by__role',
+)
+
+# Lowercased display label -> stored value, in choice order, for matching imported CSV labels
+INDUSTRY_IMPORT_LOOKUP = {display.lower(): value for value, display in Customer.INDUSTRY_CHOICES}
+TERRITORY_IMPORT_LOOKUP = {display.lower(): value for value, display in Customer.TERRITORY_CHOICES}
+
+# Byte-order marks checked before falling back to trial decoding of uploaded CSVs
+CSV_BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+CSV_FALLBACK_ENCODINGS = ('utf-8', 'cp1252', 'latin-1')
+
+def decode_csv_upload(content):
+    """Decode uploaded CSV bytes, trusting a BOM when present; returns None if nothing fits"""
+    for bom, encoding in CSV_BOM_ENCODINGS:
+        if content.startswith(bom):
+            try:
+                return content.decode(encoding)
+            except UnicodeDecodeError:
+                return None
+    for encoding in CSV_FALLBACK_ENCODINGS:
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+# Delinquency CSV columns by header name; later names are accepted as aliases
+DELINQUENCY_IMPORT_COLUMNS = (
+    ('company_name',),
+    ('email',),
+    ('contact_person',),
+    ('remarks', 'Remarks'),
+    ('tin_number', 'TIN Number'),
+    ('status',),
+    ('amount_due',),
+    ('due_date',),
+    ('salesperson_username',),
+)
+
+# Static sample for download_delinquency_sample_csv, with csv.writer's \r\n line endings
+DELINQUENCY_SAMPLE_CSV = (
+    b'company_name,email,contact_person,tin_number,amount_due,due_date,status,remarks,salesperson_username\r\n'
+    b'Acme Corp,billing@acme.com,John Smith,000-123-456,100000,2026-02-15,open,Paid but hard to collect,jsmith\r\n'
+)
+
+def csv_column_getter(header, *names):
+    """Return a row -> value function for the first of names in header; '' for absent columns or short rows"""
+    positions = {name: index for index, name in enumerate(header)}
+    for name in names:
+        if name in positions:
+            index = positions[name]
+            return lambda row: row[index] if index < len(row) else ''
+    return lambda row: ''
+
+def match_choice(label, lookup):
+    """Stored value for an imported label: exact match first, then the first label containing it"""
+    label = label.lower()
+    if label in lookup:
+        return lookup[label]
+    for display, value in lookup.items():
+        if label in display:
+            return value
+    return ''
+
+class Echo:
+    """File-like object whose write() returns the line, so csv.writer rows can be streamed"""
+    def write(self, value):
+        return value
+
+# Path from a salesperson's team membership to the manager role that oversees them
+MANAGER_SCOPE_LOOKUPS = {
+    'avp': 'team_membership__group__team__avp',
+    'asm': 'team_membership__group__team__asm',
+    'supervisor': 'team_membership__group__supervisor',
+    'teamlead': 'team_membership__group__teamlead',
+}
+
+def managed_salespeople_q(user, prefix='salesperson__'):
+    """Q for rows whose salesperson (reached via prefix) reports to the given manager"""
+    return models.Q(**{prefix + MANAGER_SCOPE_LOOKUPS[user.role]: user})
+
+def visible_customers(user):
+    """Customers the user may see: all for executives, their salespeople's for managers, their own for salespeople"""
+    if user.role in ['admin', 'president', 'gm', 'vp']:
+        return Customer.objects.all()
+    if user.role in MANAGER_SCOPE_LOOKUPS:
+        return Customer.objects.filter(managed_salespeople_q(user))
+    if user.role == 'salesperson':
+        return Customer.objects.filter(salesperson=user)
+    return Customer.objects.none()
 
 def is_manager(user):
     return user.role in ['admin', 'avp', 'supervisor', 'asm', 'teamlead']
@@ -19,39 +161,10 @@ def is_executive(user):
 @login_required
 def customer_list(request):
     user = request.user
-    customers = Customer.objects.none()
     view_mode = request.GET.get('view', 'table')
 
     # Get base customer queryset based on user role
-    if user.role in ['admin', 'president', 'gm', 'vp']:
-        # Executives have full access to all customers
-        customers = Customer.objects.all()
-    elif user.role == 'avp':
-        teams = Team.objects.filter(avp=user)
-        groups = Group.objects.filter(team__in=teams)
-        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        salespeople = User.objects.filter(id__in=salespeople_ids)
-        customers = Customer.objects.filter(salesperson__in=salespeople)
-    elif user.role == 'asm':
-        # ASM can see customers from their assigned teams
-        asm_teams = user.asm_teams.all()
-        groups = Group.objects.filter(team__in=asm_teams)
-        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        salespeople = User.objects.filter(id__in=salespeople_ids)
-        customers = Customer.objects.filter(salesperson__in=salespeople)
-    elif user.role == 'supervisor':
-        groups = Group.objects.filter(supervisor=user)
-        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        salespeople = User.objects.filter(id__in=salespeople_ids)
-        customers = Customer.objects.filter(salesperson__in=salespeople)
-    elif user.role == 'teamlead':
-        # Teamlead can see customers from their assigned group
-        teamlead_groups = Group.objects.filter(teamlead=user)
-        salespeople_ids = TeamMembership.objects.filter(group__in=teamlead_groups).values_list('user_id', flat=True)
-        salespeople = User.objects.filter(id__in=salespeople_ids)
-        customers = Customer.objects.filter(salesperson__in=salespeople)
-    elif user.role == 'salesperson':
-        customers = Customer.objects.filter(salesperson=user)
+    customers = visible_customers(user)
 
     # Apply filters based on GET parameters
     status_filter = request.GET.get('status')
@@ -83,12 +196,29 @@ def customer_list(request):
             models.Q(email__icontains=search_query)
         )
     
-    # Order by VIP status first, then by creation date
-    customers = customers.select_related('salesperson').order_by('-is_vip', '-created_at')
+    # Order by VIP status first, then by creation date; select only the columns the
+    # table and card views render
+    customers = customers.select_related('salesperson').only(
+        'company_name', 'contact_person_name', 'contact_person_position', 'email', 'phone_number',
+        'industry', 'territory', 'is_vip', 'is_active',
+        'salesperson__username', 'salesperson__first_name', 'salesperson__last_name', 'salesperson__initials'
+    ).order_by('-is_vip', '-created_at')
+    
+    stats = customers.aggregate(
+        total=models.Count('id'),
+        vip_count=models.Count('id', filter=models.Q(is_vip=True)),
+        active_count=models.Count('id', filter=models.Q(is_active=True)),
+        inactive_count=models.Count('id', filter=models.Q(is_active=False)),
+    )
+    
+    # Only one page of customers is rendered; the stats total doubles as the paginator count
+    paginator = Paginator(customers, CUSTOMERS_PER_PAGE)
+    paginator.count = stats['total']
+    page_obj = paginator.get_page(request.GET.get('page'))
     
     # Get filter options for the template
     context = {
-        'customers': customers,
+        'customers': page_obj,
         'view_mode': view_mode,
         'show_actions': (view_mode == 'card' and user.role == 'admin'),
         'industry_choices': Customer.INDUSTRY_CHOICES,
@@ -101,12 +231,7 @@ def customer_list(request):
             'search': search_query or '',
             'view': view_mode,
         },
-        'stats': {
-            'total': customers.count(),
-            'vip_count': customers.filter(is_vip=True).count(),
-            'active_count': customers.filter(is_active=True).count(),
-            'inactive_count': customers.filter(is_active=False).count(),
-        }
+        'stats': stats,
     }
     
     return render(request, 'customers/customer_list.html', context)
@@ -119,24 +244,10 @@ def delinquent_list(request):
     # Role-based scoping
     if user.role == 'salesperson':
         records = records.filter(models.Q(salesperson=user) | models.Q(customer__salesperson=user))
-    elif user.role == 'avp':
-        teams = Team.objects.filter(avp=user)
-        groups = Group.objects.filter(team__in=teams)
-        sp_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        records = records.filter(models.Q(salesperson_id__in=sp_ids) | models.Q(customer__salesperson_id__in=sp_ids))
-    elif user.role == 'asm':
-        teams = user.asm_teams.all()
-        groups = Group.objects.filter(team__in=teams)
-        sp_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        records = records.filter(models.Q(salesperson_id__in=sp_ids) | models.Q(customer__salesperson_id__in=sp_ids))
-    elif user.role == 'supervisor':
-        groups = Group.objects.filter(supervisor=user)
-        sp_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        records = records.filter(models.Q(salesperson_id__in=sp_ids) | models.Q(customer__salesperson_id__in=sp_ids))
-    elif user.role == 'teamlead':
-        groups = Group.objects.filter(teamlead=user)
-        sp_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        records = records.filter(models.Q(salesperson_id__in=sp_ids) | models.Q(customer__salesperson_id__in=sp_ids))
+    elif user.role in MANAGER_SCOPE_LOOKUPS:
+        records = records.filter(
+            managed_salespeople_q(user) | managed_salespeople_q(user, prefix='customer__salesperson__')
+        )
     # Filters
     status = request.GET.get('status')
     min_amount = request.GET.get('min_amount')
@@ -146,12 +257,10 @@ def delinquent_list(request):
         records = records.filter(status=status)
     if min_amount:
         try:
-            from decimal import Decimal
             records = records.filter(amount_due__gte=Decimal(min_amount))
         except Exception:
             pass
     if overdue_only == 'yes':
-        from django.utils import timezone
         today = timezone.now().date()
         records = records.filter(due_date__lt=today)
     if search:
@@ -159,8 +268,9 @@ def delinquent_list(request):
             models.Q(customer__company_name__icontains=search) |
             models.Q(customer__contact_person_name__icontains=search)
         )
+    paginator = Paginator(records.order_by('due_date'), DELINQUENT_RECORDS_PER_PAGE)
     context = {
-        'records': records.order_by('due_date'),
+        'records': paginator.get_page(request.GET.get('page')),
         'current_filters': {
             'status': status,
             'min_amount': min_amount or '',
@@ -182,7 +292,6 @@ def create_customer(request):
     if request.method == 'POST':
         if user.role == 'salesperson':
             # Salespeople use the restricted form and are auto-assigned
-            from .forms import SalespersonCustomerForm
             form = SalespersonCustomerForm(request.POST, salesperson=user)
             if form.is_valid():
                 customer = form.save()
@@ -197,7 +306,6 @@ def create_customer(request):
                 return redirect('customer_list')
     else:
         if user.role == 'salesperson':
-            from .forms import SalespersonCustomerForm
             form = SalespersonCustomerForm(salesperson=user)
             context = {
                 'form': form,
@@ -238,37 +346,46 @@ def is_admin(user):
 @user_passes_test(is_admin)
 def export_customers(request):
     """Export all customers to CSV"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="customers_export.csv"'
+    writer = csv.writer(Echo())
+    customers = Customer.objects.select_related('salesperson').only(
+        'company_name', 'contact_person_name', 'contact_person_position', 'email', 'phone_number',
+        'address', 'industry', 'territory', 'is_vip', 'is_active', 'created_at', 'updated_at',
+        'salesperson__initials'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
     
-    writer = csv.writer(response)
-    # Write header
-    writer.writerow([
-        'Company Name', 'Contact Person Name', 'Contact Person Position', 'Email', 'Phone Number', 'Address', 
-        'Industry', 'Territory', 'VIP Status', 'Active Status', 'Salesperson Initials',
-        'Created At', 'Updated At'
-    ])
+    # Resolve labels straight from the class-level maps instead of per-row property calls
+    industry_labels = Customer.INDUSTRY_LABELS
+    territory_labels = Customer.TERRITORY_LABELS
     
-    # Write customer data
-    customers = Customer.objects.all().select_related('salesperson')
-    for customer in customers:
-        salesperson_initials = customer.salesperson.initials if customer.salesperson and customer.salesperson.initials else ''
-        writer.writerow([
-            customer.company_name,
-            customer.contact_person_name,
-            customer.contact_person_position,
-            customer.email,
-            customer.phone_number,
-            customer.address,
-            customer.get_industry_display() if customer.industry else '',
-            customer.get_territory_display() if customer.territory else '',
-            'Yes' if customer.is_vip else 'No',
-            'Yes' if customer.is_active else 'No',
-            salesperson_initials,
-            customer.created_at.strftime('%Y-%m-%d %H:%M:%S') if customer.created_at else '',
-            customer.updated_at.strftime('%Y-%m-%d %H:%M:%S') if customer.updated_at else '',
+    def rows():
+        # Write header
+        yield writer.writerow([
+            'Company Name', 'Contact Person Name', 'Contact Person Position', 'Email', 'Phone Number', 'Address', 
+            'Industry', 'Territory', 'VIP Status', 'Active Status', 'Salesperson Initials',
+            'Created At', 'Updated At'
         ])
+        
+        # Write customer data as it is fetched
+        for customer in customers:
+            salesperson_initials = customer.salesperson.initials if customer.salesperson and customer.salesperson.initials else ''
+            yield writer.writerow([
+                customer.company_name,
+                customer.contact_person_name,
+                customer.contact_person_position,
+                customer.email,
+                customer.phone_number,
+                customer.address,
+                industry_labels.get(customer.industry, customer.industry),
+                territory_labels.get(customer.territory, customer.territory),
+                'Yes' if customer.is_vip else 'No',
+                'Yes' if customer.is_active else 'No',
+                salesperson_initials,
+                customer.created_at.strftime('%Y-%m-%d %H:%M:%S') if customer.created_at else '',
+                customer.updated_at.strftime('%Y-%m-%d %H:%M:%S') if customer.updated_at else '',
+            ])
     
+    response = StreamingHttpResponse(rows(), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="customers_export.csv"'
     return response
 
 @login_required
@@ -286,125 +403,130 @@ def import_customers(request):
             return redirect('customer_list')
         
         try:
-            # Read CSV file content
-            content = csv_file.read()
-            
-            # Try decoding with different encodings
-            decoded_file = None
-            for encoding in ['utf-8', 'cp1252', 'latin-1']:
-                try:
-                    decoded_file = content.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
+            # Read and decode CSV file content in a single pass where possible
+            decoded_file = decode_csv_upload(csv_file.read())
             
             if decoded_file is None:
                 messages.error(request, 'Unable to read the CSV file. Unsupported encoding.')
                 return redirect('customer_list')
 
-            csv_data = csv.reader(io.StringIO(decoded_file))
+            # newline='' lets csv split CR-only (Mac Excel) files and keep quoted line breaks
+            csv_data = csv.reader(io.StringIO(decoded_file, newline=''))
             
             # Skip header row
             next(csv_data, None)
-            
-            imported_count = 0
             errors = []
             
+            # Map each row onto the column schema once, padding missing trailing columns
+            records = []
             for row_num, row in enumerate(csv_data, start=2):
-                if len(row) < 5:  # Minimum required fields
+                if len(row) < CUSTOMER_IMPORT_MIN_COLUMNS:
                     errors.append(f'Row {row_num}: Not enough columns')
                     continue
-                
-                # Extract all columns based on export format
-                company_name = row[0] if len(row) > 0 else ''
-                contact_person_name = row[1] if len(row) > 1 else ''
-                contact_person_position = row[2] if len(row) > 2 else ''
-                email = row[3] if len(row) > 3 else ''
-                phone_number = row[4] if len(row) > 4 else ''
-                address = row[5] if len(row) > 5 else ''
-                industry = row[6] if len(row) > 6 else ''
-                territory = row[7] if len(row) > 7 else ''
-                vip_status = row[8] if len(row) > 8 else 'No'
-                active_status = row[9] if len(row) > 9 else 'Yes'
-                salesperson_initials = row[10] if len(row) > 10 else ''
-                # Skip Created At and Updated At (columns 11-12) as they're auto-generated
-                
-                if not company_name or not contact_person_name or not email:
+                values = dict(CUSTOMER_IMPORT_DEFAULTS)
+                values.update(zip(CUSTOMER_IMPORT_FIELDS, row))
+                values['email'] = Customer.normalize_email(values['email'])
+                records.append((row_num, values))
+            
+            # Look up existing emails and salespeople for the whole file up front
+            existing_emails = set(Customer.objects.filter(
+                email__in={values['email'] for _, values in records}
+            ).values_list('email', flat=True))
+            salespeople_by_initials = {}
+            ambiguous_initials = set()
+            for salesperson in User.objects.filter(
+                initials__in={values['salesperson_initials'] for _, values in records} - {''},
+                role='salesperson',
+                is_active=True
+            ):
+                if salesperson.initials in salespeople_by_initials:
+                    ambiguous_initials.add(salesperson.initials)
+                salespeople_by_initials[salesperson.initials] = salesperson
+            
+            new_customers = []
+            
+            for row_num, values in records:
+                email = values['email']
+                if not values['company_name'] or not values['contact_person_name'] or not email:
                     errors.append(f'Row {row_num}: Company name, contact person name, and email are required')
                     continue
                 
                 # Check if customer already exists
-                if Customer.objects.filter(email=email).exists():
+                if email in existing_emails:
                     errors.append(f'Row {row_num}: Customer with email {email} already exists')
                     continue
                 
                 # Validate and convert industry
+                industry = values['industry']
                 industry_value = ''
                 if industry:
-                    industry_lower = industry.lower()
-                    industry_mapping = {choice[1].lower(): choice[0] for choice in Customer.INDUSTRY_CHOICES}
-                    if industry_lower in industry_mapping:
-                        industry_value = industry_mapping[industry_lower]
-                    else:
-                        # Try to find partial match
-                        for display, value in Customer.INDUSTRY_CHOICES:
-                            if industry_lower in display.lower():
-                                industry_value = value
-                                break
-                        if not industry_value:
-                            errors.append(f'Row {row_num}: Invalid industry "{industry}"')
-                            continue
+                    industry_value = match_choice(industry, INDUSTRY_IMPORT_LOOKUP)
+                    if not industry_value:
+                        errors.append(f'Row {row_num}: Invalid industry "{industry}"')
+                        continue
                 
                 # Validate and convert territory
+                territory = values['territory']
                 territory_value = ''
                 if territory:
-                    territory_lower = territory.lower()
-                    territory_mapping = {choice[1].lower(): choice[0] for choice in Customer.TERRITORY_CHOICES}
-                    if territory_lower in territory_mapping:
-                        territory_value = territory_mapping[territory_lower]
-                    else:
-                        # Try to find partial match
-                        for display, value in Customer.TERRITORY_CHOICES:
-                            if territory_lower in display.lower():
-                                territory_value = value
-                                break
-                        if not territory_value:
-                            errors.append(f'Row {row_num}: Invalid territory "{territory}"')
-                            continue
-                
-                # Parse VIP status
-                is_vip = vip_status.lower() in ['yes', 'true', '1']
-                
-                # Parse active status
-                is_active = active_status.lower() in ['yes', 'true', '1']
+                    territory_value = match_choice(territory, TERRITORY_IMPORT_LOOKUP)
+                    if not territory_value:
+                        errors.append(f'Row {row_num}: Invalid territory "{territory}"')
+                        continue
                 
                 # Get salesperson if initials are provided
+                salesperson_initials = values['salesperson_initials']
                 salesperson = None
                 if salesperson_initials:
-                    try:
-                        salesperson = User.objects.get(initials=salesperson_initials, role='salesperson', is_active=True)
-                    except User.DoesNotExist:
+                    if salesperson_initials in ambiguous_initials:
+                        errors.append(f'Row {row_num}: More than one active salesperson has initials "{salesperson_initials}"')
+                        continue
+                    salesperson = salespeople_by_initials.get(salesperson_initials)
+                    if salesperson is None:
                         errors.append(f'Row {row_num}: Active salesperson with initials "{salesperson_initials}" not found')
                         continue
                 
-                # Create customer
+                customer = Customer(
+                    company_name=values['company_name'],
+                    contact_person_name=values['contact_person_name'],
+                    contact_person_position=values['contact_person_position'],
+                    email=email,
+                    phone_number=values['phone_number'],
+                    address=values['address'],
+                    industry=industry_value,
+                    territory=territory_value,
+                    is_vip=values['vip_status'].lower() in IMPORT_TRUE_VALUES,
+                    is_active=values['active_status'].lower() in IMPORT_TRUE_VALUES,
+                    salesperson=salesperson
+                )
+                # Catch values the database would reject (e.g. over-long fields) before the
+                # batched insert, so one bad row doesn't abort the whole file
                 try:
-                    Customer.objects.create(
-                        company_name=company_name,
-                        contact_person_name=contact_person_name,
-                        contact_person_position=contact_person_position,
-                        email=email,
-                        phone_number=phone_number,
-                        address=address,
-                        industry=industry_value,
-                        territory=territory_value,
-                        is_vip=is_vip,
-                        is_active=is_active,
-                        salesperson=salesperson
+                    customer.full_clean(exclude=['salesperson'], validate_unique=False, validate_constraints=False)
+                except ValidationError as e:
+                    details = '; '.join(
+                        f'{field}: {" ".join(field_errors)}' for field, field_errors in e.message_dict.items()
+                    )
+                    errors.append(f'Row {row_num}: {details}')
+                    continue
+                new_customers.append(customer)
+                # Later rows with the same email count as duplicates
+                existing_emails.add(email)
+            
+            # Create customers and their history entries in batched inserts
+            with transaction.atomic():
+                Customer.objects.bulk_create(new_customers, batch_size=IMPORT_BATCH_SIZE)
+                CustomerHistory.log_customer_changes([
+                    CustomerHistory.build_customer_change(
+                        customer=customer,
+                        action='imported',
+                        description=f'Customer imported from CSV by {request.user.username}',
+                        changed_by=request.user,
+                        request=request
                     )
-                    imported_count += 1
-                except Exception as e:
-                    errors.append(f'Row {row_num}: Error creating customer - {str(e)}')
+                    for customer in new_customers
+                ])
+            imported_count = len(new_customers)
             
             if imported_count > 0:
                 messages.success(request, f'Successfully imported {imported_count} customers.')
@@ -457,33 +579,41 @@ def download_sample_csv(request):
     return response
 
 
+def toggle_customer_flag(pk, field):
+    """Invert a boolean Customer field with one UPDATE and return the customer"""
+    with transaction.atomic():
+        updated = Customer.objects.filter(pk=pk).update(**{field: ~F(field), 'updated_at': timezone.now()})
+        if not updated:
+            raise Http404('No Customer matches the given query.')
+        return Customer.objects.only(
+            'company_name', 'contact_person_name', 'salesperson_id', field
+        ).get(pk=pk)
+
 @login_required
 @user_passes_test(is_admin)
 def toggle_customer_vip(request, pk):
     """Toggle customer VIP status (AJAX endpoint)"""
     if request.method == 'POST':
         try:
-            customer = get_object_or_404(Customer, pk=pk)
-            old_vip_status = customer.is_vip
-            customer.is_vip = not customer.is_vip
-            customer.save()
-            
-            # Log history event
-            action = 'vip_enabled' if customer.is_vip else 'vip_disabled'
-            description = f"Customer VIP status changed from {'VIP' if old_vip_status else 'Regular'} to {'VIP' if customer.is_vip else 'Regular'} by {request.user.get_full_name() or request.user.username}"
-            
-            history_entry = CustomerHistory(
-                customer=customer,
-                action=action,
-                description=description,
-                changed_by=request.user,
-                salesperson_at_time=customer.salesperson,
-                old_value={'is_vip': old_vip_status},
-                new_value={'is_vip': customer.is_vip},
-                ip_address=request.META.get('REMOTE_ADDR'),
-                user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
-            )
-            history_entry.save()
+            # The flag flip and its history entry commit together or not at all
+            with transaction.atomic():
+                # Flip the flag in SQL, then read back only what the response and history need
+                customer = toggle_customer_flag(pk, 'is_vip')
+                old_vip_status = not customer.is_vip
+                
+                # Log history event
+                action = 'vip_enabled' if customer.is_vip else 'vip_disabled'
+                description = f"Customer VIP status changed from {'VIP' if old_vip_status else 'Regular'} to {'VIP' if customer.is_vip else 'Regular'} by {request.user.get_full_name() or request.user.username}"
+                
+                CustomerHistory.log_customer_change(
+                    customer=customer,
+                    action=action,
+                    description=description,
+                    changed_by=request.user,
+                    old_value={'is_vip': old_vip_status},
+                    new_value={'is_vip': customer.is_vip},
+                    request=request
+                )
             
             return JsonResponse({
                 'success': True,
@@ -503,73 +633,58 @@ def toggle_customer_vip(request, pk):
 @login_required
 def customer_history(request, pk):
     """View complete history of a customer for tracking and salesperson attribution"""
-    customer = get_object_or_404(Customer, pk=pk)
-    
-    # Check if user has permission to view this customer
-    user = request.user
-    has_access = False
+    # Fetch the customer through the user's scope, so the access check is part of the lookup
+    customer = visible_customers(request.user).select_related('salesperson').filter(pk=pk).first()
     
-    if user.role in ['admin', 'president', 'gm', 'vp']:
-        has_access = True
-    elif user.role == 'avp':
-        teams = Team.objects.filter(avp=user)
-        groups = Group.objects.filter(team__in=teams)
-        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        has_access = customer.salesperson_id in salespeople_ids
-    elif user.role == 'asm':
-        asm_teams = user.asm_teams.all()
-        groups = Group.objects.filter(team__in=asm_teams)
-        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        has_access = customer.salesperson_id in salespeople_ids
-    elif user.role == 'supervisor':
-        groups = Group.objects.filter(supervisor=user)
-        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
-        has_access = customer.salesperson_id in salespeople_ids
-    elif user.role == 'teamlead':
-        teamlead_groups = Group.objects.filter(teamlead=user)
-        salespeople_ids = TeamMembership.objects.filter(group__in=teamlead_groups).values_list('user_id', flat=True)
-        has_access = customer.salesperson_id in salespeople_ids
-    elif user.role == 'salesperson':
-        has_access = customer.salesperson == user
-    
-    if not has_access:
+    if customer is None:
+        if not Customer.objects.filter(pk=pk).exists():
+            raise Http404('No Customer matches the given query.')
         messages.error(request, 'You do not have permission to view this customer history.')
         return redirect('customer_list')
     
-    # Get history records
+    # Only one page of history is rendered; the summary cards load afterwards from
+    # customer_history_summary so they don't hold up the first paint
     history = CustomerHistory.objects.filter(customer=customer).select_related(
         'changed_by', 'salesperson_at_time'
     ).order_by('-timestamp')
     
-    # Get summary statistics
-    history_stats = {
-        'total_changes': history.count(),
-        'vip_changes': history.filter(action__in=['vip_enabled', 'vip_disabled']).count(),
-        'status_changes': history.filter(action__in=['activated', 'deactivated']).count(),
-        'salesperson_changes': history.filter(action__in=['salesperson_assigned', 'salesperson_changed', 'salesperson_removed']).count(),
-        'field_updates': history.filter(action='field_updated').count(),
-    }
-    
-    # Get unique salespeople who have handled this customer
-    salespeople_history = history.filter(
-        salesperson_at_time__isnull=False
-    ).values_list(
-        'salesperson_at_time__username',
-        'salesperson_at_time__first_name',
-        'salesperson_at_time__last_name',
-        'salesperson_at_time__initials'
-    ).distinct()
-    
     context = {
         'customer': customer,
-        'history': history,
-        'history_stats': history_stats,
-        'salespeople_history': salespeople_history,
+        'history': Paginator(history, HISTORY_ENTRIES_PER_PAGE).get_page(request.GET.get('page')),
     }
     
     return render(request, 'customers/customer_history.html', context)
 
 
+@login_required
+def customer_history_summary(request, pk):
+    """History stats and past salespeople for customer_history (AJAX endpoint)"""
+    if not visible_customers(request.user).filter(pk=pk).exists():
+        raise Http404('No Customer matches the given query.')
+    
+    # Get summary statistics
+    history_stats = CustomerHistory.objects.filter(customer_id=pk).aggregate(
+        total_changes=models.Count('id'),
+        vip_changes=models.Count('id', filter=models.Q(action__in=['vip_enabled', 'vip_disabled'])),
+        status_changes=models.Count('id', filter=models.Q(action__in=['activated', 'deactivated'])),
+        salesperson_changes=models.Count('id', filter=models.Q(
+            action__in=['salesperson_assigned', 'salesperson_changed', 'salesperson_removed']
+        )),
+        field_updates=models.Count('id', filter=models.Q(action='field_updated')),
+    )
+    
+    # Get unique salespeople who have handled this customer; matching user ids in a
+    # subquery avoids a DISTINCT over the joined name columns
+    salespeople_history = User.objects.filter(
+        id__in=CustomerHistory.objects.filter(customer_id=pk).values('salesperson_at_time_id')
+    ).order_by('username').values('username', 'first_name', 'last_name', 'initials')
+    
+    return JsonResponse({
+        'history_stats': history_stats,
+        'salespeople_history': list(salespeople_history),
+    })
+
+
 # =====================================================================
 # ADMIN CUSTOMER MANAGEMENT & BACKUP/RESTORE FUNCTIONALITY
 # =====================================================================
@@ -578,18 +693,25 @@ def customer_history(request, pk):
 @user_passes_test(is_admin)
 def edit_customer(request, pk):
     """Admin can edit customer details with automatic backup"""
-    customer = get_object_or_404(Customer, pk=pk)
+    customer = get_object_or_404(Customer.objects.select_related('salesperson'), pk=pk)
     
     if request.method == 'POST':
-        # Create backup before making changes
-        customer.create_backup(
+        # Snapshot the current state now; validation copies the submitted values onto customer
+        backup = customer.build_backup(
             changed_by=request.user,
             reason="Before admin edit"
         )
         
         form = CustomerForm(request.POST, instance=customer)
         if form.is_valid():
-            form.save()
+            if not form.has_changed():
+                messages.info(request, f'No changes were made to customer "{customer.full_name}".')
+                return redirect('customer_list')
+            
+            backup.reason = f"Before admin edit: {', '.join(form.changed_data)}"
+            with transaction.atomic():
+                backup.save()
+                form.save()
             messages.success(request, f'Customer "{customer.full_name}" has been updated successfully. Backup created automatically.')
             return redirect('customer_list')
         else:
@@ -598,7 +720,9 @@ def edit_customer(request, pk):
         form = CustomerForm(instance=customer)
     
     # Get recent backups for this customer
-    recent_backups = CustomerBackup.objects.filter(customer=customer)[:5]
+    recent_backups = CustomerBackup.objects.filter(customer=customer).select_related(
+        'changed_by'
+    ).only(*BACKUP_LIST_FIELDS)[:5]
     
     context = {
         'form': form,
@@ -612,7 +736,6 @@ def edit_customer(request, pk):
 @login_required
 @user_passes_test(is_admin)
 def create_delinquency(request):
-    from .forms import DelinquencyRecordForm
     if request.method == 'POST':
         form = DelinquencyRecordForm(request.POST)
         if form.is_valid():
@@ -635,50 +758,82 @@ def import_delinquencies(request):
             messages.error(request, 'Please select a CSV file to upload.')
             return redirect('delinquent_list')
         try:
-            import csv, io
-            decoded = io.TextIOWrapper(csv_file.file, encoding='utf-8')
-            reader = csv.DictReader(decoded)
-            created = 0
-            for row in reader:
-                company = row.get('company_name') or ''
-                email = row.get('email') or ''
-                contact = row.get('contact_person') or ''
-                remarks = row.get('remarks') or row.get('Remarks') or ''
-                tin_number = row.get('tin_number') or row.get('TIN Number') or ''
-                status = (row.get('status') or 'open').lower()
-                amount_str = row.get('amount_due') or '0'
-                due_date_str = row.get('due_date') or ''
-                sp_username = row.get('salesperson_username') or ''
-                from decimal import Decimal
+            decoded = decode_csv_upload(csv_file.read())
+            if decoded is None:
+                messages.error(request, 'Unable to read the CSV file. Unsupported encoding.')
+                return redirect('delinquent_list')
+            reader = csv.reader(io.StringIO(decoded, newline=''))
+            # Resolve each column's position from the header once; rows stay plain lists
+            header = next(reader, [])
+            get = {
+                names[0]: csv_column_getter(header, *names) for names in DELINQUENCY_IMPORT_COLUMNS
+            }
+            rows = list(reader)
+            # Look up the customers and salespeople referenced by the file in one query each
+            customers_by_email = {
+                customer.email: customer
+                for customer in Customer.objects.filter(
+                    email__in={Customer.normalize_email(get['email'](row)) for row in rows} - {''}
+                )
+            }
+            # Company names match case-insensitively; like .first() under the default
+            # ordering, the newest customer wins when several share a name
+            customers_by_company = {}
+            for customer in Customer.objects.annotate(company_key=Lower('company_name')).filter(
+                company_key__in={get['company_name'](row).lower() for row in rows} - {''}
+            ):
+                customers_by_company.setdefault(customer.company_name.lower(), customer)
+            salespeople_by_username = User.objects.filter(role='salesperson').in_bulk(
+                {get['salesperson_username'](row) for row in rows} - {''}, field_name='username'
+            )
+            new_customers = []
+            new_records = []
+            for row in rows:
+                company = get['company_name'](row)
+                email = Customer.normalize_email(get['email'](row))
+                contact = get['contact_person'](row)
+                remarks = get['remarks'](row)
+                tin_number = get['tin_number'](row)
+                status = (get['status'](row) or 'open').lower()
+                amount_str = get['amount_due'](row) or '0'
+                due_date_str = get['due_date'](row)
+                sp_username = get['salesperson_username'](row)
                 amount = Decimal(str(amount_str)) if amount_str else Decimal('0')
-                from django.utils.dateparse import parse_date
                 due_date = parse_date(due_date_str) if due_date_str else None
-                # Find or create customer
+                # Find or create customer; customers created earlier in the file are reused
                 customer = None
                 if email:
-                    customer = Customer.objects.filter(email=email).first()
+                    customer = customers_by_email.get(email)
                 if not customer and company:
-                    customer = Customer.objects.filter(company_name__iexact=company).first()
+                    customer = customers_by_company.get(company.lower())
                 if not customer and company:
-                    customer = Customer.objects.create(
+                    # bulk_create skips save(), so normalize the email here
+                    customer = Customer(
                         company_name=company,
                         contact_person_name=contact or 'Unknown',
-                        email=email or f"unknown_{company.replace(' ','_')}@example.com"
+                        email=Customer.normalize_email(email or f"unknown_{company.replace(' ','_')}@example.com")
                     )
+                    new_customers.append(customer)
+                    customers_by_email[customer.email] = customer
+                    customers_by_company[company.lower()] = customer
                 # Find salesperson
-                salesperson = User.objects.filter(username=sp_username, role='salesperson').first() if sp_username else None
+                salesperson = salespeople_by_username.get(sp_username)
                 if customer:
-                    DelinquencyRecord.objects.create(
+                    new_records.append(DelinquencyRecord(
                         customer=customer,
                         salesperson=salesperson,
-                        status=status if status in ['open','resolved','watch'] else 'open',
+                        status=status if status in DelinquencyRecord.STATUS_LABELS else 'open',
                         tin_number=tin_number,
                         amount_due=amount,
                         due_date=due_date,
                         remarks=remarks,
                         created_by=request.user
-                    )
-                    created += 1
+                    ))
+            # New customers get their keys first so the records can point at them
+            with transaction.atomic():
+                Customer.objects.bulk_create(new_customers, batch_size=IMPORT_BATCH_SIZE)
+                DelinquencyRecord.objects.bulk_create(new_records, batch_size=IMPORT_BATCH_SIZE)
+            created = len(new_records)
             messages.success(request, f'Imported {created} delinquency records.')
             return redirect('delinquent_list')
         except Exception as e:
@@ -689,49 +844,55 @@ def import_delinquencies(request):
 @login_required
 @user_passes_test(is_admin)
 def download_delinquency_sample_csv(request):
-    response = HttpResponse(content_type='text/csv')
+    response = HttpResponse(DELINQUENCY_SAMPLE_CSV, content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="delinquency_sample.csv"'
-    import csv
-    writer = csv.writer(response)
-    writer.writerow(['company_name','email','contact_person','tin_number','amount_due','due_date','status','remarks','salesperson_username'])
-    writer.writerow(['Acme Corp','billing@acme.com','John Smith','000-123-456','100000','2026-02-15','open','Paid but hard to collect','jsmith'])
     return response
 
 @login_required
 @user_passes_test(is_admin)
 def export_delinquencies(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="delinquency_export.csv"'
-    import csv
-    writer = csv.writer(response)
-    writer.writerow([
-        'company_name','email','contact_person','tin_number','status','amount_due','due_date','last_payment_date','remarks','salesperson_username','created_by','updated_at'
-    ])
-    qs = DelinquencyRecord.objects.select_related('customer','salesperson','created_by').all().order_by('customer__company_name')
-    for rec in qs:
-        writer.writerow([
-            rec.customer.company_name,
-            rec.customer.email,
-            rec.customer.contact_person_name,
-            rec.tin_number or '',
-            rec.get_status_display(),
-            f"{rec.amount_due}",
-            rec.due_date.isoformat() if rec.due_date else '',
-            rec.last_payment_date.isoformat() if rec.last_payment_date else '',
-            rec.remarks.replace('\n',' ').strip() if rec.remarks else '',
-            rec.salesperson.username if rec.salesperson else (rec.customer.salesperson.username if rec.customer.salesperson else ''),
-            rec.created_by.username if rec.created_by else '',
-            rec.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
+    writer = csv.writer(Echo())
+    # Plain tuples in CSV column order; no model instances are built per row
+    qs = DelinquencyRecord.objects.values_list(
+        'customer__company_name', 'customer__email', 'customer__contact_person_name',
+        'tin_number', 'status', 'amount_due', 'due_date', 'last_payment_date', 'remarks',
+        'salesperson__username', 'customer__salesperson__username', 'created_by__username', 'updated_at'
+    ).order_by('customer__company_name').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    status_labels = DelinquencyRecord.STATUS_LABELS
+    
+    def rows():
+        yield writer.writerow([
+            'company_name','email','contact_person','tin_number','status','amount_due','due_date','last_payment_date','remarks','salesperson_username','created_by','updated_at'
         ])
+        for (company_name, email, contact_person, tin_number, status, amount_due, due_date,
+             last_payment_date, remarks, salesperson, customer_salesperson, created_by, updated_at) in qs:
+            yield writer.writerow([
+                company_name,
+                email,
+                contact_person,
+                tin_number or '',
+                status_labels.get(status, status),
+                f"{amount_due}",
+                due_date.isoformat() if due_date else '',
+                last_payment_date.isoformat() if last_payment_date else '',
+                remarks.replace('\n',' ').strip() if remarks else '',
+                salesperson or customer_salesperson or '',
+                created_by or '',
+                updated_at.strftime('%Y-%m-%d %H:%M:%S'),
+            ])
+    
+    response = StreamingHttpResponse(rows(), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="delinquency_export.csv"'
     return response
 
-
 @login_required
 @user_passes_test(is_admin)
 def customer_backups(request, pk):
     """View all backups for a specific customer"""
     customer = get_object_or_404(Customer, pk=pk)
-    backups = CustomerBackup.objects.filter(customer=customer)
+    backups = CustomerBackup.objects.filter(customer=customer).select_related(
+        'changed_by', 'blob'
+    ).only(*BACKUP_LIST_FIELDS, 'blob__data')
     
     context = {
         'customer': customer,
@@ -746,7 +907,7 @@ def customer_backups(request, pk):
 def create_manual_backup(request, pk):
     """Create a manual backup of customer data"""
     if request.method == 'POST':
-        customer = get_object_or_404(Customer, pk=pk)
+        customer = get_object_or_404(Customer.objects.select_related('salesperson'), pk=pk)
         reason = request.POST.get('reason', 'Manual backup by admin')
         
         try:
@@ -768,7 +929,11 @@ def create_manual_backup(request, pk):
 def restore_customer(request, customer_pk, backup_pk):
     """Restore customer from a specific backup"""
     customer = get_object_or_404(Customer, pk=customer_pk)
-    backup = get_object_or_404(CustomerBackup, pk=backup_pk, customer=customer)
+    backup = get_object_or_404(
+        CustomerBackup.objects.select_related('blob', 'customer__salesperson'),
+        pk=backup_pk,
+        customer=customer
+    )
     
     if request.method == 'POST':
         try:
@@ -794,22 +959,37 @@ def restore_customer(request, customer_pk, backup_pk):
     return render(request, 'customers/restore_customer.html', context)
 
 
+def backup_overview_summary():
+    """Return backup coverage stats and the ten customers with most backups"""
+    # Filtering on the relation first makes it an inner join, so customers
+    # without backups never reach the GROUP BY
+    customers_by_backup_count = Customer.objects.only(
+        'id', 'company_name', 'contact_person_name'
+    ).filter(backups__isnull=False).annotate(
+        backup_count=models.Count('backups')
+    ).order_by('-backup_count')[:10]
+    return {
+        'stats': CustomerBackup.coverage_stats(),
+        'customers_by_backup_count': list(customers_by_backup_count),
+    }
+
+
 @login_required
 @user_passes_test(is_admin)
 def backup_overview(request):
     """Overview of all customer backups in the system"""
-    # Get statistics
-    total_customers = Customer.objects.count()
-    total_backups = CustomerBackup.objects.count()
-    customers_with_backups = Customer.objects.filter(backups__isnull=False).distinct().count()
+    # Get statistics and the customers with most backups, cached briefly;
+    # customer and backup writes clear the cache
+    summary = cache.get_or_set(BACKUP_OVERVIEW_CACHE_KEY, backup_overview_summary, timeout=BACKUP_OVERVIEW_TIMEOUT)
+    stats = summary['stats']
+    total_customers = stats['total_customers']
+    total_backups = stats['total_backups']
+    customers_with_backups = stats['customers_with_backups']
     
     # Get recent backups across all customers
-    recent_backups = CustomerBackup.objects.select_related('customer', 'changed_by').order_by('-created_at')[:20]
-    
-    # Get customers with most backups
-    customers_by_backup_count = Customer.objects.annotate(
-        backup_count=models.Count('backups')
-    ).filter(backup_count__gt=0).order_by('-backup_count')[:10]
+    recent_backups = CustomerBackup.objects.select_related('customer', 'changed_by').only(
+        *BACKUP_LIST_FIELDS, 'customer__company_name', 'customer__contact_person_name'
+    ).order_by('-created_at')[:20]
     
     # Calculate coverage percentage
     coverage_percent = 0
@@ -825,7 +1005,7 @@ def backup_overview(request):
             'coverage_percent': coverage_percent,
         },
         'recent_backups': recent_backups,
-        'customers_by_backup_count': customers_by_backup_count,
+        'customers_by_backup_count': summary['customers_by_backup_count'],
     }
     
     return render(request, 'customers/backup_overview.html', context)
@@ -837,27 +1017,25 @@ def toggle_customer_active(request, pk):
     """Toggle customer active status (AJAX endpoint)"""
     if request.method == 'POST':
         try:
-            customer = get_object_or_404(Customer, pk=pk)
-            old_active_status = customer.is_active
-            customer.is_active = not customer.is_active
-            customer.save()
-            
-            # Log history event
-            action = 'activated' if customer.is_active else 'deactivated'
-            description = f"Customer status changed from {'Active' if old_active_status else 'Inactive'} to {'Active' if customer.is_active else 'Inactive'} by {request.user.get_full_name() or request.user.username}"
-            
-            history_entry = CustomerHistory(
-                customer=customer,
-                action=action,
-                description=description,
-                changed_by=request.user,
-                salesperson_at_time=customer.salesperson,
-                old_value={'is_active': old_active_status},
-                new_value={'is_active': customer.is_active},
-                ip_address=request.META.get('REMOTE_ADDR'),
-                user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
-            )
-            history_entry.save()
+            # The flag flip and its history entry commit together or not at all
+            with transaction.atomic():
+                # Flip the flag in SQL, then read back only what the response and history need
+                customer = toggle_customer_flag(pk, 'is_active')
+                old_active_status = not customer.is_active
+                
+                # Log history event
+                action = 'activated' if customer.is_active else 'deactivated'
+                description = f"Customer status changed from {'Active' if old_active_status else 'Inactive'} to {'Active' if customer.is_active else 'Inactive'} by {request.user.get_full_name() or request.user.username}"
+                
+                CustomerHistory.log_customer_change(
+                    customer=customer,
+                    action=action,
+                    description=description,
+                    changed_by=request.user,
+                    old_value={'is_active': old_active_status},
+                    new_value={'is_active': customer.is_active},
+                    request=request
+                )
             
             status = 'activated' if customer.is_active else 'deactivated'
             return JsonResponse({
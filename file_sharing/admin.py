@@ -1,7 +1,33 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from .models import GroupFileShare, FileCategory, FileAccessLog
 
+
+class FasterAdminPaginator(Paginator):
+    """Paginator that estimates unfiltered counts of large PostgreSQL tables"""
+    # Below this many rows an exact COUNT(*) is cheap enough to keep
+    ESTIMATE_THRESHOLD = 100000
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql' or queryset.query.where:
+            return super().count
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 (or missing) until the table has been analyzed
+        if row is None or row[0] < self.ESTIMATE_THRESHOLD:
+            return super().count
+        return row[0]
+
 @admin.register(FileCategory)
 class FileCategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'description', 'icon']
@@ -24,6 +50,8 @@ class GroupFileShareAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'group__name', 'uploaded_by__username']
     readonly_fields = ['uploaded_at', 'updated_at', 'file_size', 'mime_type', 'download_count']
     inlines = [FileAccessLogInline]
+    paginator = FasterAdminPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('File Information', {
@@ -52,6 +80,8 @@ class FileAccessLogAdmin(admin.ModelAdmin):
     search_fields = ['file_share__title', 'user__username', 'ip_address']
     readonly_fields = ['file_share', 'user', 'action', 'timestamp', 'ip_address', 'user_agent']
     ordering = ['-timestamp']
+    paginator = FasterAdminPaginator
+    show_full_result_count = False
     
     def has_add_permission(self, request):
         return False
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_sharing', '0001_initial'),
+        ('teams', '0014_alter_team_avp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fileaccesslog',
+            index=models.Index(fields=['-timestamp'], name='file_sharin_timesta_9a6a70_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fileaccesslog',
+            index=models.Index(fields=['file_share', '-timestamp'], name='file_sharin_file_sh_78b4ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groupfileshare',
+            index=models.Index(fields=['group', 'is_active', 'category'], name='gfs_group_active_cat_idx'),
+        ),
+    ]
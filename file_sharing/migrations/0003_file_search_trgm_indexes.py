@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:40
+
+from django.db import migrations
+
+# The file listings search title and description with icontains, which
+# PostgreSQL runs as UPPER(col::text) LIKE UPPER('%term%'); trigram GIN indexes
+# on those same expressions let it answer the unanchored LIKE without a
+# sequential scan.
+SEARCH_COLUMNS = {
+    'gfs_title_trgm_idx': 'title',
+    'gfs_description_trgm_idx': 'description',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in SEARCH_COLUMNS.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON file_sharing_groupfileshare '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_sharing', '0002_access_paths_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
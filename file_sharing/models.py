@@ -36,13 +36,15 @@ class FileCategory(models.Model):
         ('training', 'Training Materials'),
         ('other', 'Other Documents'),
     ]
+    # Category labels keyed by value, built once for display lookups
+    CATEGORY_LABELS = dict(CATEGORY_CHOICES)
     
     name = models.CharField(max_length=50, choices=CATEGORY_CHOICES, unique=True)
     description = models.TextField(blank=True, help_text='Optional description of this category')
     icon = models.CharField(max_length=50, default='📄', help_text='Icon for this category')
     
     def __str__(self):
-        return dict(self.CATEGORY_CHOICES)[self.name]
+        return self.CATEGORY_LABELS[self.name]
     
     class Meta:
         verbose_name_plural = 'File Categories'
@@ -50,6 +52,35 @@ class FileCategory(models.Model):
 
 class GroupFileShare(models.Model):
     """Shared files for a group"""
+    # Icon shown next to each category, shared by every file
+    CATEGORY_ICONS = {
+        'proposals': '📋',
+        'contracts': '📄',
+        'presentations': '📊',
+        'forms': '📝',
+        'resources': '📚',
+        'training': '🎓',
+        'other': '📁',
+    }
+    
+    # MIME type by lowercase file extension, used when saving uploads
+    MIME_TYPES = {
+        '.pdf': 'application/pdf',
+        '.doc': 'application/msword',
+        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        '.xls': 'application/vnd.ms-excel',
+        '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        '.ppt': 'application/vnd.ms-powerpoint',
+        '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        '.txt': 'text/plain',
+        '.jpg': 'image/jpeg',
+        '.jpeg': 'image/jpeg',
+        '.png': 'image/png',
+        '.gif': 'image/gif',
+        '.zip': 'application/zip',
+        '.rar': 'application/x-rar-compressed',
+    }
+    
     group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='shared_files')
     title = models.CharField(max_length=200, help_text='Descriptive title for the file')
     description = models.TextField(blank=True, help_text='Optional description of the file contents')
@@ -77,27 +108,14 @@ class GroupFileShare(models.Model):
     mime_type = models.CharField(max_length=100, blank=True)
     
     def save(self, *args, **kwargs):
-        if self.file:
+        # Counter-only saves such as downloads leave the file alone, so skip
+        # the storage stat and MIME lookup
+        update_fields = kwargs.get('update_fields')
+        if self.file and (update_fields is None or 'file' in update_fields):
             self.file_size = self.file.size
             # Try to determine mime type from file extension
             ext = os.path.splitext(self.file.name)[1].lower()
-            mime_map = {
-                '.pdf': 'application/pdf',
-                '.doc': 'application/msword',
-                '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                '.xls': 'application/vnd.ms-excel',
-                '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                '.ppt': 'application/vnd.ms-powerpoint',
-                '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-                '.txt': 'text/plain',
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.png': 'image/png',
-                '.gif': 'image/gif',
-                '.zip': 'application/zip',
-                '.rar': 'application/x-rar-compressed',
-            }
-            self.mime_type = mime_map.get(ext, 'application/octet-stream')
+            self.mime_type = self.MIME_TYPES.get(ext, 'application/octet-stream')
         super().save(*args, **kwargs)
     
     def get_file_size_display(self):
@@ -105,34 +123,31 @@ class GroupFileShare(models.Model):
         if not self.file_size:
             return 'Unknown'
         
+        size = self.file_size
         for unit in ['bytes', 'KB', 'MB', 'GB']:
-            if self.file_size < 1024.0:
-                return f"{self.file_size:.1f} {unit}"
-            self.file_size /= 1024.0
-        return f"{self.file_size:.1f} TB"
+            if size < 1024.0:
+                return f"{size:.1f} {unit}"
+            size /= 1024.0
+        return f"{size:.1f} TB"
     
     def get_category_display(self):
         """Return display name for category"""
-        return dict(FileCategory.CATEGORY_CHOICES)[self.category]
+        return FileCategory.CATEGORY_LABELS.get(self.category, self.category)
     
     def get_category_icon(self):
         """Return icon for category"""
-        icons = {
-            'proposals': '📋',
-            'contracts': '📄',
-            'presentations': '📊', 
-            'forms': '📝',
-            'resources': '📚',
-            'training': '🎓',
-            'other': '📁',
-        }
-        return icons.get(self.category, '📄')
+        return self.CATEGORY_ICONS.get(self.category, '📄')
     
     def __str__(self):
         return f"{self.title} ({self.group.name})"
     
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # Group file listings always filter on group and is_active, and
+            # optionally narrow by category
+            models.Index(fields=['group', 'is_active', 'category'], name='gfs_group_active_cat_idx'),
+        ]
         verbose_name = 'Group File Share'
         verbose_name_plural = 'Group File Shares'
 
@@ -157,5 +172,9 @@ class FileAccessLog(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp']),
+            models.Index(fields=['file_share', '-timestamp']),
+        ]
         verbose_name = 'File Access Log'
         verbose_name_plural = 'File Access Logs'
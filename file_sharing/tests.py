@@ -1,3 +1,187 @@
-from django.test import TestCase
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, models
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from teams.models import Group, Team, TeamMembership
+from users.models import User
+from .admin import FasterAdminPaginator
+from .models import FileAccessLog, GroupFileShare
+from .views import user_can_access_group, user_can_delete_file
+
+
+class GroupFileShareSizeDisplayTests(SimpleTestCase):
+    def test_display_leaves_file_size_untouched(self):
+        file_share = GroupFileShare(file_size=5 * 1024 * 1024)
+        self.assertEqual(file_share.get_file_size_display(), '5.0 MB')
+        self.assertEqual(file_share.get_file_size_display(), '5.0 MB')
+        self.assertEqual(file_share.file_size, 5 * 1024 * 1024)
+
+    def test_unknown_without_size(self):
+        self.assertEqual(GroupFileShare().get_file_size_display(), 'Unknown')
+
+
+class GroupFileShareSaveTests(SimpleTestCase):
+    def test_counter_save_skips_file_metadata(self):
+        file_share = GroupFileShare(file='group_files/1/other/missing.pdf', file_size=10)
+        with mock.patch.object(models.Model, 'save') as base_save:
+            file_share.save(update_fields=['download_count'])
+        base_save.assert_called_once_with(update_fields=['download_count'])
+        self.assertEqual(file_share.file_size, 10)
+        self.assertEqual(file_share.mime_type, '')
+
+
+class FasterAdminPaginatorTests(TestCase):
+    def test_exact_count_outside_postgresql(self):
+        paginator = FasterAdminPaginator(FileAccessLog.objects.all(), 20)
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 0)
+            self.assertEqual(paginator.count, 0)
+
+
+class FileShareViewTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = User.objects.create_user(username='admin1', password='pass', role='admin')
+        avp = User.objects.create_user(username='avp1', password='pass', role='avp')
+        supervisor = User.objects.create_user(username='sup1', password='pass', role='supervisor')
+        team = Team.objects.create(name='TEAM A', avp=avp)
+        group = Group.objects.create(name='Group X', team=team, group_type='regular', supervisor=supervisor)
+        self.file_share = GroupFileShare.objects.create(
+            group=group, title='Price list', uploaded_by=self.admin,
+            file=SimpleUploadedFile('prices.txt', b'hello'),
+        )
+        self.client.force_login(self.admin)
+
+    def add_file(self, title):
+        return GroupFileShare.objects.create(
+            group=self.file_share.group, title=title, uploaded_by=self.admin,
+            file=SimpleUploadedFile(f'{title}.txt', b'hello'),
+        )
+
+
+class DownloadFileTests(FileShareViewTestCase):
+    def test_download_logs_access_and_counts_in_sql(self):
+        url = reverse('download_file', args=[self.file_share.pk])
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertEqual(b''.join(response.streaming_content), b'hello')
+            response.close()
+        self.file_share.refresh_from_db()
+        self.assertEqual(self.file_share.download_count, 2)
+        self.assertEqual(FileAccessLog.objects.filter(file_share=self.file_share, action='download').count(), 2)
+
+    def test_download_count_is_incremented_by_the_database(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('download_file', args=[self.file_share.pk])).close()
+        updates = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"download_count" + 1', updates[0])
+
+    def test_view_serves_inline(self):
+        response = self.client.get(reverse('view_file', args=[self.file_share.pk]))
+        self.assertEqual(response['Content-Disposition'], 'inline; filename="prices.txt"')
+        self.assertEqual(b''.join(response.streaming_content), b'hello')
+        response.close()
+
+    @override_settings(FILE_SHARING_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_download_hands_file_to_nginx_when_configured(self):
+        response = self.client.get(reverse('download_file', args=[self.file_share.pk]))
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.file_share.file.name}')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="prices.txt"')
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(response.content, b'')
+
+    def test_delete_permission_compares_ids_without_queries(self):
+        supervisor = User.objects.get(username='sup1')
+        avp = User.objects.get(username='avp1')
+        file_share = GroupFileShare.objects.select_related('group__team').get(pk=self.file_share.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user_can_delete_file(supervisor, file_share))
+            self.assertTrue(user_can_delete_file(avp, file_share))
+            self.assertTrue(user_can_delete_file(self.admin, file_share))
+
+    def test_file_details_loads_rendered_relations_up_front(self):
+        url = reverse('file_details', args=[self.file_share.pk])
+        self.client.get(url)
+        # Session, user, file with its group and people, access check, log insert,
+        # recent logs
+        with self.assertNumQueries(6):
+            self.assertContains(self.client.get(url), 'Price list')
+
+    def test_upload_saves_file_and_logs_it(self):
+        response = self.client.post(reverse('upload_file', args=[self.file_share.group.pk]), {
+            'title': 'Rate card', 'category': 'other', 'file': SimpleUploadedFile('rates.txt', b'rates'),
+        })
+        self.assertRedirects(response, reverse('group_files', args=[self.file_share.group.pk]))
+        upload = GroupFileShare.objects.get(title='Rate card')
+        self.assertEqual(upload.uploaded_by, self.admin)
+        self.assertTrue(FileAccessLog.objects.filter(file_share=upload, action='upload').exists())
+
+
+class FileListingTests(FileShareViewTestCase):
+    def test_listings_query_count_does_not_grow_with_files(self):
+        urls = [
+            reverse('group_files', args=[self.file_share.group.pk]),
+            reverse('my_files'),
+            reverse('all_files'),
+        ]
+        self.client.get(urls[0])
+        baseline = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+            baseline[url] = len(ctx)
+        self.add_file('brochure')
+        self.add_file('catalog')
+        for url in urls:
+            with self.assertNumQueries(baseline[url]):
+                self.assertContains(self.client.get(url), 'catalog')
+
+    def test_listings_run_each_count_once(self):
+        for url in [reverse('group_files', args=[self.file_share.group.pk]), reverse('my_files'), reverse('all_files')]:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.context['total_files'], 1)
+            counts = [query['sql'] for query in ctx.captured_queries if 'COUNT(*)' in query['sql']]
+            self.assertEqual(len(counts), len(set(counts)))
+
+
+class GroupAccessTests(TestCase):
+    def setUp(self):
+        avp = User.objects.create_user(username='avp1', password='pass', role='avp')
+        supervisor = User.objects.create_user(username='sup1', password='pass', role='supervisor')
+        team = Team.objects.create(name='TEAM A', avp=avp)
+        self.group = Group.objects.create(name='Group X', team=team, group_type='regular', supervisor=supervisor)
+        self.other_group = Group.objects.create(name='Group Y', team=team, group_type='regular', supervisor=supervisor)
+        self.agent = User.objects.create_user(username='sp1', password='pass', role='salesperson')
+        TeamMembership.objects.create(user=self.agent, group=self.group)
+        self.client.force_login(self.agent)
+
+    def test_agent_sees_only_own_group(self):
+        self.assertEqual(self.client.get(reverse('group_files', args=[self.group.pk])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('group_files', args=[self.other_group.pk])).status_code, 404)
+
+    def test_group_files_resolves_accessible_groups_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('group_files', args=[self.group.pk]))
+        self.assertTrue(response.context['can_upload'])
+        membership_queries = [q for q in ctx.captured_queries if 'teams_teammembership' in q['sql']]
+        self.assertEqual(len(membership_queries), 1)
+
+    def test_access_checks_share_one_id_lookup_per_request(self):
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(1):
+            self.assertTrue(user_can_access_group(self.agent, self.group, request))
+            self.assertFalse(user_can_access_group(self.agent, self.other_group, request))
+        with self.assertNumQueries(1):
+            self.assertFalse(user_can_access_group(self.agent, self.other_group))
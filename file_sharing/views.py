@@ -1,19 +1,26 @@
 import os
+from urllib.parse import quote
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import HttpResponse, Http404, FileResponse
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.views.decorators.http import require_http_methods
 from django.urls import reverse
+from django.utils.http import content_disposition_header
 
 from .models import GroupFileShare, FileAccessLog, FileCategory
 from .forms import FileUploadForm, FileFilterForm, FileEditForm
 from teams.models import Group, TeamMembership
 from users.models import User
 
+# Bytes read per chunk when Django streams a file itself
+FILE_RESPONSE_BLOCK_SIZE = 1024 * 1024
+
 def get_user_groups(user):
     """Get all groups that a user has access to"""
     if user.role in ['admin', 'president', 'gm', 'vp']:
@@ -35,36 +42,45 @@ def get_user_groups(user):
         # Team lead can access groups they lead
         return user.led_groups.all()
     else:
-        # Sales agents can access their own group
-        try:
-            membership = TeamMembership.objects.get(user=user)
-            return Group.objects.filter(id=membership.group.id)
-        except TeamMembership.DoesNotExist:
-            return Group.objects.none()
+        # Sales agents can access their own group; the membership is one-to-one,
+        # so joining through it replaces a separate TeamMembership lookup
+        return Group.objects.filter(members__user=user)
+
+def get_user_group_ids(user, request=None):
+    """Return the IDs of the groups a user can access, memoized on the request when given"""
+    if request is None:
+        return frozenset(get_user_groups(user).order_by().values_list('pk', flat=True))
+    # Permission helpers run several times per view; later checks are set lookups
+    memo = request.__dict__.setdefault('_user_group_ids_cache', {})
+    if user.pk not in memo:
+        memo[user.pk] = get_user_group_ids(user)
+    return memo[user.pk]
 
-def user_can_access_group(user, group):
+def user_can_access_group(user, group, request=None):
     """Check if user can access a specific group"""
-    accessible_groups = get_user_groups(user)
-    return group in accessible_groups
+    if request is None:
+        return get_user_groups(user).filter(pk=group.pk).exists()
+    return group.pk in get_user_group_ids(user, request)
 
-def user_can_upload_files(user, group):
+def user_can_upload_files(user, group, request=None):
     """Check if user can upload files to a group"""
     # All users who can access a group can upload files
-    return user_can_access_group(user, group)
+    return user_can_access_group(user, group, request)
 
 def user_can_delete_file(user, file_share):
     """Check if user can delete a file"""
     # Admin, executives, and file uploader can delete
     if user.role in ['admin', 'president', 'gm', 'vp']:
         return True
-    if file_share.uploaded_by == user:
+    # Compare foreign key ids so none of the related users has to be loaded
+    if file_share.uploaded_by_id == user.pk:
         return True
     # Group managers can delete files
-    if user.role == 'avp' and file_share.group.team.avp == user:
+    if user.role == 'avp' and file_share.group.team.avp_id == user.pk:
         return True
-    if user.role in ['asm', 'supervisor'] and file_share.group.supervisor == user:
+    if user.role in ['asm', 'supervisor'] and file_share.group.supervisor_id == user.pk:
         return True
-    if user.role == 'teamlead' and file_share.group.teamlead == user:
+    if user.role == 'teamlead' and file_share.group.teamlead_id == user.pk:
         return True
     return False
 
@@ -90,17 +106,38 @@ def log_file_access(file_share, user, action, request=None):
         user_agent=user_agent
     )
 
+def serve_file(file_share, as_attachment):
+    """Return a response that sends the shared file to the browser"""
+    filename = os.path.basename(file_share.file.name)
+    prefix = settings.FILE_SHARING_ACCEL_REDIRECT_PREFIX
+    if prefix:
+        # nginx streams the file itself from an internal location; Django only
+        # sets the headers
+        response = HttpResponse(content_type=file_share.mime_type)
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        response['X-Accel-Redirect'] = prefix + quote(file_share.file.name)
+        return response
+    response = FileResponse(
+        open(file_share.file.path, 'rb'),
+        as_attachment=as_attachment,
+        filename=filename
+    )
+    response['Content-Type'] = file_share.mime_type
+    # Larger reads when the server has no sendfile-backed file wrapper
+    response.block_size = FILE_RESPONSE_BLOCK_SIZE
+    return response
+
 @login_required
 def group_files(request, group_id):
     """List files for a specific group"""
     group = get_object_or_404(Group, id=group_id)
     
     # Check access permissions
-    if not user_can_access_group(request.user, group):
+    if not user_can_access_group(request.user, group, request):
         raise Http404("You don't have permission to access this group's files.")
     
     # Get files for this group
-    files = GroupFileShare.objects.filter(group=group, is_active=True)
+    files = GroupFileShare.objects.filter(group=group, is_active=True).select_related('uploaded_by')
     
     # Apply filters if provided
     filter_form = FileFilterForm(request.GET)
@@ -135,8 +172,8 @@ def group_files(request, group_id):
         'files': page_obj,
         'files_by_category': files_by_category,
         'filter_form': filter_form,
-        'can_upload': user_can_upload_files(request.user, group),
-        'total_files': files.count(),
+        'can_upload': user_can_upload_files(request.user, group, request),
+        'total_files': paginator.count,
     }
     
     return render(request, 'file_sharing/group_files.html', context)
@@ -147,7 +184,7 @@ def upload_file(request, group_id):
     group = get_object_or_404(Group, id=group_id)
     
     # Check upload permissions
-    if not user_can_upload_files(request.user, group):
+    if not user_can_upload_files(request.user, group, request):
         raise Http404("You don't have permission to upload files to this group.")
     
     if request.method == 'POST':
@@ -155,10 +192,10 @@ def upload_file(request, group_id):
         if form.is_valid():
             file_share = form.save(commit=False)
             file_share.uploaded_by = request.user
-            file_share.save()
-            
-            # Log the upload
-            log_file_access(file_share, request.user, 'upload', request)
+            # Save the file and log the upload in one commit
+            with transaction.atomic():
+                file_share.save()
+                log_file_access(file_share, request.user, 'upload', request)
             
             messages.success(request, f'File "{file_share.title}" uploaded successfully!')
             return redirect('group_files', group_id=group.id)
@@ -181,25 +218,18 @@ def download_file(request, file_id):
     file_share = get_object_or_404(GroupFileShare, id=file_id, is_active=True)
     
     # Check access permissions
-    if not user_can_access_group(request.user, file_share.group):
+    if not user_can_access_group(request.user, file_share.group, request):
         raise Http404("You don't have permission to access this file.")
     
     try:
-        # Log the download
-        log_file_access(file_share, request.user, 'download', request)
-        
-        # Increment download counter
-        file_share.download_count += 1
-        file_share.save(update_fields=['download_count'])
+        # Log the download and bump the counter in one commit; the UPDATE
+        # increments in SQL, so concurrent downloads don't lose counts
+        with transaction.atomic():
+            log_file_access(file_share, request.user, 'download', request)
+            GroupFileShare.objects.filter(pk=file_share.pk).update(download_count=F('download_count') + 1)
         
         # Serve the file
-        response = FileResponse(
-            open(file_share.file.path, 'rb'),
-            as_attachment=True,
-            filename=os.path.basename(file_share.file.name)
-        )
-        response['Content-Type'] = file_share.mime_type
-        return response
+        return serve_file(file_share, as_attachment=True)
         
     except FileNotFoundError:
         messages.error(request, 'File not found on server.')
@@ -211,7 +241,7 @@ def view_file(request, file_id):
     file_share = get_object_or_404(GroupFileShare, id=file_id, is_active=True)
     
     # Check access permissions
-    if not user_can_access_group(request.user, file_share.group):
+    if not user_can_access_group(request.user, file_share.group, request):
         raise Http404("You don't have permission to access this file.")
     
     try:
@@ -219,14 +249,7 @@ def view_file(request, file_id):
         log_file_access(file_share, request.user, 'view', request)
         
         # Serve the file for inline viewing (not as attachment)
-        response = FileResponse(
-            open(file_share.file.path, 'rb'),
-            as_attachment=False,  # This allows viewing in browser
-            filename=os.path.basename(file_share.file.name)
-        )
-        response['Content-Type'] = file_share.mime_type
-        response['Content-Disposition'] = f'inline; filename="{os.path.basename(file_share.file.name)}"'
-        return response
+        return serve_file(file_share, as_attachment=False)
         
     except FileNotFoundError:
         messages.error(request, 'File not found on server.')
@@ -235,17 +258,25 @@ def view_file(request, file_id):
 @login_required
 def file_details(request, file_id):
     """View file details"""
-    file_share = get_object_or_404(GroupFileShare, id=file_id)
+    file_share = get_object_or_404(
+        GroupFileShare.objects.select_related(
+            'uploaded_by', 'group__team__tech_manager', 'group__supervisor', 'group__teamlead'
+        ),
+        id=file_id
+    )
     
     # Check access permissions
-    if not user_can_access_group(request.user, file_share.group):
+    if not user_can_access_group(request.user, file_share.group, request):
         raise Http404("You don't have permission to access this file.")
     
     # Log the view
     log_file_access(file_share, request.user, 'view', request)
     
-    # Get recent access logs for this file (last 10)
-    recent_logs = file_share.access_logs.select_related('user').order_by('-timestamp')[:10]
+    # Get recent access logs for this file (last 10), with only the rendered
+    # columns; user agents and password hashes stay in the database
+    recent_logs = file_share.access_logs.select_related('user').only(
+        'file_share', 'action', 'timestamp', 'user__username', 'user__first_name', 'user__last_name'
+    ).order_by('-timestamp')[:10]
     
     context = {
         'file_share': file_share,
@@ -259,7 +290,7 @@ def file_details(request, file_id):
 @login_required
 def edit_file(request, file_id):
     """Edit file details"""
-    file_share = get_object_or_404(GroupFileShare, id=file_id)
+    file_share = get_object_or_404(GroupFileShare.objects.select_related('group__team'), id=file_id)
     
     # Check edit permissions
     if not user_can_delete_file(request.user, file_share):
@@ -288,7 +319,7 @@ def edit_file(request, file_id):
 @require_http_methods(["POST"])
 def delete_file(request, file_id):
     """Delete a file"""
-    file_share = get_object_or_404(GroupFileShare, id=file_id)
+    file_share = get_object_or_404(GroupFileShare.objects.select_related('group__team'), id=file_id)
     
     # Check delete permissions
     if not user_can_delete_file(request.user, file_share):
@@ -316,7 +347,7 @@ def delete_file(request, file_id):
 @login_required
 def my_files(request):
     """List files uploaded by the current user"""
-    files = GroupFileShare.objects.filter(uploaded_by=request.user).select_related('group')
+    files = GroupFileShare.objects.filter(uploaded_by=request.user).select_related('group__team')
     
     # Apply filters
     filter_form = FileFilterForm(request.GET)
@@ -342,7 +373,7 @@ def my_files(request):
         'files': page_obj,
         'filter_form': filter_form,
         'title': 'My Uploaded Files',
-        'total_files': files.count(),
+        'total_files': paginator.count,
     }
     
     return render(request, 'file_sharing/my_files.html', context)
@@ -356,14 +387,10 @@ def quick_upload(request):
         messages.error(request, "You don't have access to any groups.")
         return redirect('all_files')
     
-    # Try to find user's primary group (from team membership)
-    try:
-        membership = TeamMembership.objects.get(user=request.user)
-        primary_group = membership.group
-        if primary_group in accessible_groups:
-            return redirect('upload_file', group_id=primary_group.id)
-    except TeamMembership.DoesNotExist:
-        pass
+    # Try to find user's primary group (from team membership); only its id is needed
+    primary_group_id = TeamMembership.objects.filter(user=request.user).values_list('group_id', flat=True).first()
+    if primary_group_id is not None and accessible_groups.filter(pk=primary_group_id).exists():
+        return redirect('upload_file', group_id=primary_group_id)
     
     # Fall back to first accessible group
     first_group = accessible_groups.first()
@@ -397,7 +424,7 @@ def all_groups_files(request):
     files = GroupFileShare.objects.filter(
         group__in=accessible_groups,
         is_active=True
-    ).select_related('group', 'uploaded_by')
+    ).select_related('group__team', 'uploaded_by')
     
     # Apply filters
     filter_form = FileFilterForm(request.GET)
@@ -424,7 +451,7 @@ def all_groups_files(request):
         'files': page_obj,
         'filter_form': filter_form,
         'title': 'All Group Files',
-        'total_files': files.count(),
+        'total_files': paginator.count,
         'accessible_groups': accessible_groups,
     }
     
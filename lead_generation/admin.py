@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count, Q
 from django.utils.html import format_html
 from django.urls import reverse
 from .models import (
@@ -13,12 +14,27 @@ class LeadSourceAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     readonly_fields = ['created_at']
     
+    def total_leads(self, obj):
+        return obj._total_leads
+    total_leads.short_description = 'Total Leads'
+    total_leads.admin_order_field = '_total_leads'
+    
+    def converted_leads(self, obj):
+        return obj._converted_leads
+    converted_leads.short_description = 'Converted Leads'
+    converted_leads.admin_order_field = '_converted_leads'
+    
     def conversion_rate_display(self, obj):
-        return f"{obj.conversion_rate:.1f}%"
+        rate = (obj._converted_leads / obj._total_leads) * 100 if obj._total_leads else 0
+        return f"{rate:.1f}%"
     conversion_rate_display.short_description = 'Conversion Rate'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('leads')
+        # Count per source in the changelist query instead of two COUNTs per row
+        return super().get_queryset(request).annotate(
+            _total_leads=Count('leads'),
+            _converted_leads=Count('leads', filter=Q(leads__status='converted')),
+        )
 
 
 @admin.register(Lead)
@@ -34,6 +50,9 @@ class LeadAdmin(admin.ModelAdmin):
     search_fields = ['first_name', 'last_name', 'email', 'company_name', 'phone_number']
     readonly_fields = ['lead_score', 'days_as_lead', 'created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('source', 'assigned_to')
+    
     fieldsets = (
         ('Basic Information', {
             'fields': ('first_name', 'last_name', 'email', 'phone_number', 'company_name', 'job_title')
@@ -99,7 +118,8 @@ class LeadAdmin(admin.ModelAdmin):
     
     def calculate_lead_scores(self, request, queryset):
         count = 0
-        for lead in queryset:
+        # Stream the selection so large batches don't sit in the result cache
+        for lead in queryset.iterator(chunk_size=500):
             lead.calculate_lead_score()
             count += 1
         self.message_user(request, f"Recalculated lead scores for {count} leads.")
@@ -129,6 +149,9 @@ class LeadActivityAdmin(admin.ModelAdmin):
     search_fields = ['lead__first_name', 'lead__last_name', 'title', 'description']
     readonly_fields = ['created_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('lead', 'performed_by')
+    
     fieldsets = (
         ('Activity Info', {
             'fields': ('lead', 'activity_type', 'title', 'description', 'performed_by')
@@ -151,6 +174,9 @@ class LeadScoringAdmin(admin.ModelAdmin):
     list_filter = ['last_calculated']
     search_fields = ['lead__first_name', 'lead__last_name', 'lead__company_name']
     readonly_fields = ['total_score', 'last_calculated']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('lead')
 
 
 @admin.register(ConversionTracking)
@@ -166,6 +192,9 @@ class ConversionTrackingAdmin(admin.ModelAdmin):
     ]
     readonly_fields = ['conversion_date', 'days_to_convert']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('lead', 'customer', 'converted_by')
+    
     def roi_display(self, obj):
         roi = obj.roi
         if roi is not None:
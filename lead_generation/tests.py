@@ -1,3 +1,57 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from users.models import User
+from .models import Lead, LeadSource
+
+
+class LeadAdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='root', password='pass', email='root@example.com')
+        self.client.force_login(self.admin)
+        self.source_count = 0
+
+    def add_lead(self, name):
+        self.source_count += 1
+        source = LeadSource.objects.create(name=f'Source {self.source_count}', source_type='website')
+        salesperson = User.objects.create_user(username=f'sp_{name}', password='pass', role='salesperson')
+        return Lead.objects.create(
+            first_name=name, last_name='Lead', email=f'{name}@example.com',
+            source=source, assigned_to=salesperson,
+        )
+
+    def test_changelist_query_count_does_not_grow_with_leads(self):
+        url = reverse('admin:lead_generation_lead_changelist')
+        self.add_lead('first')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.add_lead('second')
+        self.add_lead('third')
+        with self.assertNumQueries(len(ctx)):
+            self.assertContains(self.client.get(url), 'third')
+
+
+class LeadSourceAdminChangelistTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            User.objects.create_superuser(username='root', password='pass', email='root@example.com')
+        )
+        source = LeadSource.objects.create(name='Website', source_type='website')
+        for index, status in enumerate(['new', 'converted', 'converted', 'lost']):
+            Lead.objects.create(first_name=f'L{index}', last_name='Lead', email=f'l{index}@example.com',
+                                source=source, status=status)
+
+    def test_changelist_shows_lead_counts_from_annotations(self):
+        url = reverse('admin:lead_generation_leadsource_changelist')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        LeadSource.objects.create(name='Referral', source_type='referral')
+        with self.assertNumQueries(len(ctx)):
+            self.client.get(url)
+        self.assertContains(response, '50.0%')
+        self.assertContains(response, '<td class="field-total_leads">4</td>', html=True)
+        self.assertContains(response, '<td class="field-converted_leads">2</td>', html=True)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SalesFunnelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sales_funnel'
+
+    def ready(self):
+        from . import signals  # noqa: F401
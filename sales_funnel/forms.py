@@ -116,7 +116,7 @@ class SalesFunnelForm(forms.ModelForm):
         return cleaned_data
 
 
-from teams.models import Team, Group, TeamMembership
+from teams.models import Group, TeamMembership
 
 
 class FunnelFilterForm(forms.Form):
@@ -169,14 +169,10 @@ class FunnelFilterForm(forms.Form):
                 salespeople_ids = TeamMembership.objects.filter(group__in=teamlead_groups).values_list('user_id', flat=True)
                 qs = User.objects.filter(id__in=salespeople_ids)
             elif user.role == 'asm':
-                asm_teams = user.asm_teams.all()
-                groups = Group.objects.filter(team__in=asm_teams)
-                salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
+                salespeople_ids = TeamMembership.objects.filter(group__team__asm=user).values_list('user_id', flat=True)
                 qs = User.objects.filter(id__in=salespeople_ids)
             elif user.role == 'avp':
-                teams = Team.objects.filter(avp=user)
-                groups = Group.objects.filter(team__in=teams)
-                salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
+                salespeople_ids = TeamMembership.objects.filter(group__team__avp=user).values_list('user_id', flat=True)
                 qs = User.objects.filter(id__in=salespeople_ids)
             else:
                 qs = User.objects.filter(role='salesperson', is_active=True)
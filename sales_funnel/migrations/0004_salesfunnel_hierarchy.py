@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_hierarchy(apps, schema_editor):
+    SalesFunnel = apps.get_model('sales_funnel', 'SalesFunnel')
+    TeamMembership = apps.get_model('teams', 'TeamMembership')
+    for membership in TeamMembership.objects.select_related('group__team'):
+        group = membership.group
+        SalesFunnel.objects.filter(salesperson_id=membership.user_id).update(
+            supervisor_id=group.supervisor_id,
+            teamlead_id=group.teamlead_id,
+            team_id=group.team_id,
+            avp_id=group.team.avp_id,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0009_alter_customerhistory_action'),
+        ('sales_funnel', '0003_alter_salesfunnel_stage'),
+        ('teams', '0014_alter_team_avp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesfunnel',
+            name='avp',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='avp_funnel_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='salesfunnel',
+            name='supervisor',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='supervised_funnel_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='salesfunnel',
+            name='team',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='funnel_entries', to='teams.team'),
+        ),
+        migrations.AddField(
+            model_name='salesfunnel',
+            name='teamlead',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='teamlead_funnel_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='salesfunnel',
+            index=models.Index(fields=['supervisor', 'is_active', 'is_closed', 'stage'], name='sales_funne_supervi_0f064e_idx'),
+        ),
+        migrations.RunPython(backfill_hierarchy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0009_alter_customerhistory_action'),
+        ('sales_funnel', '0004_salesfunnel_hierarchy'),
+        ('teams', '0014_alter_team_avp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salesfunnel',
+            index=models.Index(fields=['salesperson', 'is_active', 'is_closed', 'stage'], name='sf_sp_active_stage_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesfunnel',
+            index=models.Index(fields=['is_active', 'is_closed', 'date_created'], name='sf_active_recent_idx'),
+        ),
+    ]
@@ -64,6 +64,42 @@ class SalesFunnel(models.Model):
         help_text="Associated customer (if exists in customer database)"
     )
     
+    # Denormalized hierarchy of the salesperson's group, kept in sync by
+    # save() and the TeamMembership/Group/Team signals so role scoping is a
+    # single-column filter instead of a TeamMembership join
+    supervisor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='supervised_funnel_entries',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    teamlead = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='teamlead_funnel_entries',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    team = models.ForeignKey(
+        'teams.Team',
+        on_delete=models.SET_NULL,
+        related_name='funnel_entries',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    avp = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='avp_funnel_entries',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    
     # Additional Information
     expected_close_date = models.DateField(
         null=True,
@@ -119,6 +155,9 @@ class SalesFunnel(models.Model):
             models.Index(fields=['stage', 'is_active']),
             models.Index(fields=['date_created']),
             models.Index(fields=['expected_close_date']),
+            models.Index(fields=['supervisor', 'is_active', 'is_closed', 'stage']),
+            models.Index(fields=['salesperson', 'is_active', 'is_closed', 'stage'], name='sf_sp_active_stage_idx'),
+            models.Index(fields=['is_active', 'is_closed', 'date_created'], name='sf_active_recent_idx'),
         ]
         verbose_name = 'Sales Funnel Entry'
         verbose_name_plural = 'Sales Funnel Entries'
@@ -160,7 +199,29 @@ class SalesFunnel(models.Model):
         }
         return icons.get(self.stage, 'fas fa-circle')
     
+    @staticmethod
+    def hierarchy_for_group(group):
+        """Return the denormalized hierarchy field values for a group (or None)"""
+        if group is None:
+            return {'supervisor_id': None, 'teamlead_id': None, 'team_id': None, 'avp_id': None}
+        return {
+            'supervisor_id': group.supervisor_id,
+            'teamlead_id': group.teamlead_id,
+            'team_id': group.team_id,
+            'avp_id': group.team.avp_id,
+        }
+    
+    def sync_hierarchy(self):
+        """Copy the salesperson's current group hierarchy onto this entry"""
+        from teams.models import TeamMembership
+        membership = TeamMembership.objects.select_related('group__team').filter(
+            user_id=self.salesperson_id
+        ).first()
+        for field, value in self.hierarchy_for_group(membership.group if membership else None).items():
+            setattr(self, field, value)
+    
     def save(self, *args, **kwargs):
+        self.sync_hierarchy()
         # Auto-set closed_date when marking as closed
         if self.is_closed and not self.closed_date:
             from django.utils import timezone
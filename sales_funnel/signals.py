@@ -0,0 +1,33 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from teams.models import Team, Group, TeamMembership
+from .models import SalesFunnel
+
+# Keep SalesFunnel's denormalized supervisor/teamlead/team/avp columns in step
+# with the salesperson's group hierarchy
+
+@receiver(post_save, sender=TeamMembership)
+def sync_funnel_hierarchy_on_membership_save(sender, instance, **kwargs):
+    SalesFunnel.objects.filter(salesperson_id=instance.user_id).update(
+        **SalesFunnel.hierarchy_for_group(instance.group)
+    )
+
+@receiver(post_delete, sender=TeamMembership)
+def clear_funnel_hierarchy_on_membership_delete(sender, instance, **kwargs):
+    SalesFunnel.objects.filter(salesperson_id=instance.user_id).update(
+        **SalesFunnel.hierarchy_for_group(None)
+    )
+
+@receiver(post_save, sender=Group)
+def sync_funnel_hierarchy_on_group_save(sender, instance, created, **kwargs):
+    if created:
+        return  # A new group has no members yet
+    SalesFunnel.objects.filter(salesperson__team_membership__group=instance).update(
+        **SalesFunnel.hierarchy_for_group(instance)
+    )
+
+@receiver(post_save, sender=Team)
+def sync_funnel_avp_on_team_save(sender, instance, created, **kwargs):
+    if created:
+        return
+    SalesFunnel.objects.filter(team=instance).update(avp_id=instance.avp_id)
@@ -28,6 +28,21 @@ def is_manager(user):
 def is_exec_admin(user):
     return user.role in ['admin', 'president', 'gm', 'vp']
 
+def team_visible_salespeople_q(groups, asm_teams=None):
+    """Q matching entries owned by members or supervisors of groups and
+    (optionally) ASMs of asm_teams.
+
+    Each part stays an unevaluated subquery so the database resolves the
+    whole visibility check in one statement.
+    """
+    visible_q = (
+        Q(salesperson_id__in=TeamMembership.objects.filter(group__in=groups).values('user_id')) |
+        Q(salesperson_id__in=groups.filter(supervisor__isnull=False).values('supervisor_id'))
+    )
+    if asm_teams is not None:
+        visible_q |= Q(salesperson_id__in=asm_teams.filter(asm__isnull=False).values('asm_id'))
+    return visible_q
+
 def can_add_entry(user):
     return user.role in ['salesperson', 'supervisor', 'asm', 'avp']
 
@@ -65,26 +80,20 @@ def funnel_dashboard(request):
         )
     elif user.role == 'asm':
         # ASM can see entries from their teams
-        asm_teams = user.asm_teams.all()
-        groups = Group.objects.filter(team__in=asm_teams)
-        salespeople_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
-        supervisor_ids = list(Group.objects.filter(team__in=asm_teams, supervisor__isnull=False).values_list('supervisor_id', flat=True))
-        visible_ids = salespeople_ids + supervisor_ids
+        groups = Group.objects.filter(team__asm=user)
+        visible_q = team_visible_salespeople_q(groups)
         funnel_entries = SalesFunnel.objects.filter(
-            Q(salesperson_id__in=visible_ids) | Q(salesperson=user),
+            visible_q | Q(salesperson=user),
             is_active=True,
             is_closed=False
         )
     elif user.role == 'avp':
         # AVP can see entries from their teams
         teams = Team.objects.filter(avp=user)
-        groups = Group.objects.filter(team__in=teams)
-        salespeople_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
-        asm_ids = list(teams.exclude(asm__isnull=True).values_list('asm_id', flat=True))
-        supervisor_ids = list(Group.objects.filter(team__in=teams, supervisor__isnull=False).values_list('supervisor_id', flat=True))
-        visible_ids = salespeople_ids + asm_ids + supervisor_ids
+        groups = Group.objects.filter(team__avp=user)
+        visible_q = team_visible_salespeople_q(groups, teams)
         funnel_entries = SalesFunnel.objects.filter(
-            Q(salesperson_id__in=visible_ids) | Q(salesperson=user),
+            visible_q | Q(salesperson=user),
             is_active=True,
             is_closed=False
         )
@@ -133,20 +142,14 @@ def funnel_dashboard(request):
         salespeople_ids = TeamMembership.objects.filter(group__in=teamlead_groups).values_list('user_id', flat=True)
         closed_deals = SalesFunnel.objects.filter(salesperson_id__in=salespeople_ids, is_closed=True)
     elif user.role == 'asm':
-        asm_teams = user.asm_teams.all()
-        groups = Group.objects.filter(team__in=asm_teams)
-        salespeople_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
-        supervisor_ids = list(Group.objects.filter(team__in=asm_teams, supervisor__isnull=False).values_list('supervisor_id', flat=True))
-        visible_ids = salespeople_ids + supervisor_ids
-        closed_deals = SalesFunnel.objects.filter(Q(salesperson_id__in=visible_ids) | Q(salesperson=user), is_closed=True)
+        groups = Group.objects.filter(team__asm=user)
+        visible_q = team_visible_salespeople_q(groups)
+        closed_deals = SalesFunnel.objects.filter(visible_q | Q(salesperson=user), is_closed=True)
     elif user.role == 'avp':
         teams = Team.objects.filter(avp=user)
-        groups = Group.objects.filter(team__in=teams)
-        salespeople_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
-        asm_ids = list(teams.exclude(asm__isnull=True).values_list('asm_id', flat=True))
-        supervisor_ids = list(Group.objects.filter(team__in=teams, supervisor__isnull=False).values_list('supervisor_id', flat=True))
-        visible_ids = salespeople_ids + asm_ids + supervisor_ids
-        closed_deals = SalesFunnel.objects.filter(Q(salesperson_id__in=visible_ids) | Q(salesperson=user), is_closed=True)
+        groups = Group.objects.filter(team__avp=user)
+        visible_q = team_visible_salespeople_q(groups, teams)
+        closed_deals = SalesFunnel.objects.filter(visible_q | Q(salesperson=user), is_closed=True)
     else:
         closed_deals = SalesFunnel.objects.filter(is_closed=True)
     
@@ -228,27 +231,21 @@ def export_funnel_report(request):
 
     if user.role == 'supervisor':
         groups = Group.objects.filter(supervisor=user)
-        salespeople_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
+        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values('user_id')
         qs = SalesFunnel.objects.filter(Q(salesperson_id__in=salespeople_ids) | Q(salesperson=user), is_active=True, is_closed=False)
     elif user.role == 'teamlead':
         teamlead_groups = Group.objects.filter(teamlead=user)
         salespeople_ids = TeamMembership.objects.filter(group__in=teamlead_groups).values_list('user_id', flat=True)
         qs = SalesFunnel.objects.filter(salesperson_id__in=salespeople_ids, is_active=True, is_closed=False)
     elif user.role == 'asm':
-        asm_teams = user.asm_teams.all()
-        groups = Group.objects.filter(team__in=asm_teams)
-        salespeople_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
-        supervisor_ids = list(Group.objects.filter(team__in=asm_teams, supervisor__isnull=False).values_list('supervisor_id', flat=True))
-        visible_ids = salespeople_ids + supervisor_ids
-        qs = SalesFunnel.objects.filter(Q(salesperson_id__in=visible_ids) | Q(salesperson=user), is_active=True, is_closed=False)
+        groups = Group.objects.filter(team__asm=user)
+        visible_q = team_visible_salespeople_q(groups)
+        qs = SalesFunnel.objects.filter(visible_q | Q(salesperson=user), is_active=True, is_closed=False)
     elif user.role == 'avp':
         teams = Team.objects.filter(avp=user)
-        groups = Group.objects.filter(team__in=teams)
-        salespeople_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
-        asm_ids = list(teams.exclude(asm__isnull=True).values_list('asm_id', flat=True))
-        supervisor_ids = list(Group.objects.filter(team__in=teams, supervisor__isnull=False).values_list('supervisor_id', flat=True))
-        visible_ids = salespeople_ids + asm_ids + supervisor_ids
-        qs = SalesFunnel.objects.filter(Q(salesperson_id__in=visible_ids) | Q(salesperson=user), is_active=True, is_closed=False)
+        groups = Group.objects.filter(team__avp=user)
+        visible_q = team_visible_salespeople_q(groups, teams)
+        qs = SalesFunnel.objects.filter(visible_q | Q(salesperson=user), is_active=True, is_closed=False)
     else:
         qs = SalesFunnel.objects.filter(is_active=True, is_closed=False)
 
@@ -481,17 +478,13 @@ def deals_history(request):
             is_closed=True
         )
     elif user.role == 'asm':
-        asm_teams = user.asm_teams.all()
-        groups = Group.objects.filter(team__in=asm_teams)
-        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
+        salespeople_ids = TeamMembership.objects.filter(group__team__asm=user).values_list('user_id', flat=True)
         closed_deals = SalesFunnel.objects.filter(
             salesperson_id__in=salespeople_ids,
             is_closed=True
         )
     elif user.role == 'avp':
-        teams = Team.objects.filter(avp=user)
-        groups = Group.objects.filter(team__in=teams)
-        salespeople_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
+        salespeople_ids = TeamMembership.objects.filter(group__team__avp=user).values_list('user_id', flat=True)
         closed_deals = SalesFunnel.objects.filter(
             salesperson_id__in=salespeople_ids,
             is_closed=True
@@ -615,13 +608,9 @@ def import_funnel_entries(request):
                 groups = Group.objects.filter(supervisor=request.user)
                 allowed_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
             elif request.user.role == 'asm':
-                asm_teams = request.user.asm_teams.all()
-                groups = Group.objects.filter(team__in=asm_teams)
-                allowed_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
+                allowed_ids = list(TeamMembership.objects.filter(group__team__asm=request.user).values_list('user_id', flat=True))
             elif request.user.role == 'avp':
-                teams = Team.objects.filter(avp=request.user)
-                groups = Group.objects.filter(team__in=teams)
-                allowed_ids = list(TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True))
+                allowed_ids = list(TeamMembership.objects.filter(group__team__avp=request.user).values_list('user_id', flat=True))
             elif request.user.role == 'admin':
                 allowed_ids = [sp.id]
             if allowed_ids and sp.id not in allowed_ids:
@@ -815,13 +804,9 @@ def import_funnel_entries(request):
             groups = Group.objects.filter(supervisor=request.user)
             sp_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
         elif request.user.role == 'asm':
-            asm_teams = request.user.asm_teams.all()
-            groups = Group.objects.filter(team__in=asm_teams)
-            sp_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
+            sp_ids = TeamMembership.objects.filter(group__team__asm=request.user).values_list('user_id', flat=True)
         elif request.user.role == 'avp':
-            teams = Team.objects.filter(avp=request.user)
-            groups = Group.objects.filter(team__in=teams)
-            sp_ids = TeamMembership.objects.filter(group__in=groups).values_list('user_id', flat=True)
+            sp_ids = TeamMembership.objects.filter(group__team__avp=request.user).values_list('user_id', flat=True)
         else:
             sp_ids = User.objects.filter(role='salesperson', is_active=True).values_list('id', flat=True)
         available_salespeople = User.objects.filter(id__in=list(sp_ids), is_active=True).order_by('first_name','last_name','username')
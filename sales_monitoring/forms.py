@@ -9,6 +9,7 @@ from .models import (
 )
 from customers.models import Customer
 from users.models import User
+from .scoping import get_scoped_salesperson_ids
 
 class SalesActivityForm(forms.ModelForm):
     class Meta:
@@ -320,14 +321,8 @@ class ActivityFilterForm(forms.Form):
         
         # Limit salesperson choices to those in supervisor's groups
         if supervisor_user and supervisor_user.role == 'supervisor':
-            supervised_groups = supervisor_user.managed_groups.all()
-            salesperson_ids = []
-            for group in supervised_groups:
-                salesperson_ids.extend(
-                    group.members.filter(user__role='salesperson').values_list('user_id', flat=True)
-                )
             self.fields['salesperson'].queryset = User.objects.filter(
-                id__in=salesperson_ids,
+                id__in=get_scoped_salesperson_ids(supervisor_user),
                 is_active=True
             )
         
@@ -426,15 +421,8 @@ class BulkActivityUpdateForm(forms.Form):
         
         # Limit activities to those from supervisor's team
         if supervisor_user:
-            supervised_groups = supervisor_user.managed_groups.all()
-            salesperson_ids = []
-            for group in supervised_groups:
-                salesperson_ids.extend(
-                    group.members.filter(user__role='salesperson').values_list('user_id', flat=True)
-                )
-            
             self.fields['activities'].queryset = SalesActivity.objects.filter(
-                salesperson_id__in=salesperson_ids
+                salesperson_id__in=get_scoped_salesperson_ids(supervisor_user)
             ).select_related('salesperson', 'customer', 'activity_type')
         
         self.helper = FormHelper()
@@ -0,0 +1,26 @@
+from teams.models import TeamMembership
+
+# Path from a team membership to the manager who oversees its group; supervisors
+# and ASMs both reach their groups through Group.supervisor (managed_groups)
+SCOPED_SALESPEOPLE_LOOKUPS = {
+    'avp': 'group__team__avp',
+    'teamlead': 'group__teamlead',
+}
+
+def get_scoped_salesperson_ids(user, request=None):
+    """Return IDs of the salespeople in the groups the user oversees.
+
+    The IDs drive permission checks, so they are only memoized on the current
+    request and never outlive a membership or role change.
+    """
+    if request is not None:
+        memo = request.__dict__.setdefault('_scoped_salesperson_ids_cache', {})
+        if user.pk not in memo:
+            memo[user.pk] = get_scoped_salesperson_ids(user)
+        return memo[user.pk]
+    lookup = SCOPED_SALESPEOPLE_LOOKUPS.get(user.role, 'group__supervisor')
+    return list(
+        TeamMembership.objects.filter(
+            **{lookup: user}, user__role='salesperson'
+        ).values_list('user_id', flat=True)
+    )
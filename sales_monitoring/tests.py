@@ -1,4 +1,4 @@
-from django.test import TestCase, Client
+from django.test import Client, RequestFactory, TestCase
 from django.urls import reverse
 from django.utils import timezone
 from decimal import Decimal
@@ -6,6 +6,7 @@ from users.models import User
 from teams.models import Team, Group, TeamMembership, SupervisorCommitment
 from sales_funnel.models import SalesFunnel
 from sales_monitoring.views import team_performance
+from sales_monitoring.scoping import get_scoped_salesperson_ids
 
 class SupervisorCommitmentTests(TestCase):
     def setUp(self):
@@ -68,4 +69,30 @@ class SupervisorCommitmentTests(TestCase):
         self.assertIsNotNone(gdata)
         self.assertEqual(Decimal(gdata['group_quota']), Decimal('300000.00'))
 
-# Create your tests here.
+class ScopedSalespeopleTests(TestCase):
+    def setUp(self):
+        self.avp = User.objects.create_user(username='avp1', password='pass', role='avp')
+        self.supervisor = User.objects.create_user(username='sup1', password='pass', role='supervisor')
+        self.teamlead = User.objects.create_user(username='tl1', password='pass', role='teamlead')
+        self.sp1 = User.objects.create_user(username='sp1', password='pass', role='salesperson')
+        self.sp2 = User.objects.create_user(username='sp2', password='pass', role='salesperson')
+        team = Team.objects.create(name='TEAM A', avp=self.avp)
+        self.group = Group.objects.create(
+            name='Group X', team=team, group_type='regular', supervisor=self.supervisor, teamlead=self.teamlead
+        )
+        TeamMembership.objects.create(user=self.sp1, group=self.group)
+
+    def test_each_manager_role_sees_group_salespeople(self):
+        for manager in (self.avp, self.supervisor, self.teamlead):
+            self.assertEqual(get_scoped_salesperson_ids(manager), [self.sp1.id], manager.role)
+
+    def test_membership_change_is_seen_by_the_next_request(self):
+        request = RequestFactory().get('/')
+        self.assertEqual(get_scoped_salesperson_ids(self.supervisor, request), [self.sp1.id])
+        membership = TeamMembership.objects.create(user=self.sp2, group=self.group)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_scoped_salesperson_ids(self.supervisor, request), [self.sp1.id])
+        self.assertEqual(sorted(get_scoped_salesperson_ids(self.supervisor)), [self.sp1.id, self.sp2.id])
+        membership.delete()
+        self.assertEqual(get_scoped_salesperson_ids(self.supervisor, RequestFactory().get('/')), [self.sp1.id])
+
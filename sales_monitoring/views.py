@@ -18,6 +18,7 @@ from .forms import (
     ReportGenerationForm, CallActivityForm, MeetingActivityForm,
     EmailActivityForm, ProposalActivityForm, TaskActivityForm
 )
+from .scoping import get_scoped_salesperson_ids
 from teams.models import Group, TeamMembership, SupervisorCommitment
 from users.models import User
 
@@ -55,11 +56,7 @@ def supervisor_dashboard(request):
         supervised_groups = user.managed_groups.all()
     
     # Get all salespeople in supervised groups
-    salesperson_ids = []
-    for group in supervised_groups:
-        salesperson_ids.extend(
-            group.members.filter(user__role='salesperson').values_list('user_id', flat=True)
-        )
+    salesperson_ids = get_scoped_salesperson_ids(user, request)
     
     salespeople = User.objects.filter(id__in=salesperson_ids, is_active=True)
     
@@ -231,11 +228,7 @@ def avp_dashboard(request):
     groups = Group.objects.filter(team__in=user_teams)
     
     # Get all salespeople in AVP's teams
-    salesperson_ids = []
-    for group in groups:
-        salesperson_ids.extend(
-            group.members.filter(user__role='salesperson').values_list('user_id', flat=True)
-        )
+    salesperson_ids = get_scoped_salesperson_ids(user, request)
     
     salespeople = User.objects.filter(id__in=salesperson_ids, is_active=True)
     
@@ -568,12 +561,7 @@ def activity_detail(request, pk):
         return HttpResponseForbidden("You don't have permission to view this activity.")
     elif user.role in ['supervisor', 'asm', 'teamlead']:
         # Check if activity belongs to supervised team
-        if user.role == 'teamlead':
-            supervised_groups = user.led_groups.all()
-        else:
-            supervised_groups = user.managed_groups.all()
-        
-        if not any(activity.salesperson.team_membership.group in supervised_groups for group in supervised_groups):
+        if activity.salesperson_id not in get_scoped_salesperson_ids(user, request):
             return HttpResponseForbidden("You don't have permission to view this activity.")
     
     # Get related activity details
@@ -978,7 +966,7 @@ def activity_reports(request):
             
             # Generate report
             report_data = generate_activity_report(
-                user, period_start, period_end, cd['include_individual_breakdown']
+                user, period_start, period_end, cd['include_individual_breakdown'], request=request
             )
             
             context = {
@@ -1005,37 +993,16 @@ def activity_reports(request):
     
     return render(request, 'sales_monitoring/reports.html', context)
 
-def generate_activity_report(user, period_start, period_end, include_breakdown=True):
+def generate_activity_report(user, period_start, period_end, include_breakdown=True, request=None):
     """Generate activity report data"""
     
     # Determine scope based on user role
     if user.role in ['supervisor', 'asm', 'teamlead']:
-        # Get groups based on user role
-        if user.role == 'teamlead':
-            supervised_groups = user.led_groups.all()
-        else:
-            supervised_groups = user.managed_groups.all()
-        
-        salesperson_ids = []
-        for group in supervised_groups:
-            salesperson_ids.extend(
-                group.members.filter(user__role='salesperson').values_list('user_id', flat=True)
-            )
+        salesperson_ids = get_scoped_salesperson_ids(user, request)
         activities_qs = SalesActivity.objects.filter(salesperson_id__in=salesperson_ids)
     elif user.role == 'avp':
         # AVPs can only see activities from their own team's salespeople
-        from teams.models import Team
-        try:
-            user_teams = Team.objects.filter(avp=user)
-            team_groups = Group.objects.filter(team__in=user_teams)
-            salesperson_ids = []
-            for group in team_groups:
-                salesperson_ids.extend(
-                    group.members.filter(user__role='salesperson').values_list('user_id', flat=True)
-                )
-            activities_qs = SalesActivity.objects.filter(salesperson_id__in=salesperson_ids)
-        except:
-            activities_qs = SalesActivity.objects.none()
+        activities_qs = SalesActivity.objects.filter(salesperson_id__in=get_scoped_salesperson_ids(user, request))
     else:
         activities_qs = SalesActivity.objects.all()
     
@@ -1162,17 +1129,7 @@ def activity_calendar(request):
     if user.role == 'salesperson':
         activities = SalesActivity.objects.filter(salesperson=user)
     elif user.role in ['supervisor', 'asm', 'teamlead']:
-        # Get groups based on user role
-        if user.role == 'teamlead':
-            supervised_groups = user.led_groups.all()
-        else:
-            supervised_groups = user.managed_groups.all()
-        
-        salesperson_ids = []
-        for group in supervised_groups:
-            salesperson_ids.extend(
-                group.members.filter(user__role='salesperson').values_list('user_id', flat=True)
-            )
+        salesperson_ids = get_scoped_salesperson_ids(user, request)
         activities = SalesActivity.objects.filter(salesperson_id__in=salesperson_ids)
     else:
         activities = SalesActivity.objects.all()
@@ -1784,17 +1741,7 @@ def export_activities(request):
     if user.role == 'salesperson':
         activities = SalesActivity.objects.filter(salesperson=user)
     elif user.role in ['supervisor', 'asm', 'teamlead']:
-        # Get groups based on user role
-        if user.role == 'teamlead':
-            supervised_groups = user.led_groups.all()
-        else:
-            supervised_groups = user.managed_groups.all()
-        
-        salesperson_ids = []
-        for group in supervised_groups:
-            salesperson_ids.extend(
-                group.members.filter(user__role='salesperson').values_list('user_id', flat=True)
-            )
+        salesperson_ids = get_scoped_salesperson_ids(user, request)
         activities = SalesActivity.objects.filter(salesperson_id__in=salesperson_ids)
     else:
         activities = SalesActivity.objects.all()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('admin', 'Admin'), ('avp', 'AVP'), ('supervisor', 'Supervisor'), ('salesperson', 'Salesperson'), ('vp', 'Vice President'), ('gm', 'General Manager'), ('president', 'President'), ('asm', 'ASM'), ('sm', 'Sales Manager'), ('teamlead', 'Teamlead'), ('techmgr', 'Technical Manager'), ('asst_techmgr', 'Assistant Technical Manager')], db_index=True, default='salesperson', max_length=20),
+        ),
+    ]
@@ -2,21 +2,22 @@ from django.contrib.auth.models import AbstractUser, Group as AuthGroup, Permiss
 from django.db import models
 
 class User(AbstractUser):
-    ROLE_CHOICES = (
-        ('admin', 'Admin'),
-        ('avp', 'AVP'),
-        ('supervisor', 'Supervisor'),
-        ('salesperson', 'Salesperson'),
-        ('vp', 'Vice President'),
-        ('gm', 'General Manager'),
-        ('president', 'President'),
-        ('asm', 'ASM'),
-        ('sm', 'Sales Manager'),
-        ('teamlead', 'Teamlead'),
-        ('techmgr', 'Technical Manager'),
-        ('asst_techmgr', 'Assistant Technical Manager'),
-    )
-    role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='salesperson')
+    class Role(models.TextChoices):
+        ADMIN = 'admin', 'Admin'
+        AVP = 'avp', 'AVP'
+        SUPERVISOR = 'supervisor', 'Supervisor'
+        SALESPERSON = 'salesperson', 'Salesperson'
+        VP = 'vp', 'Vice President'
+        GM = 'gm', 'General Manager'
+        PRESIDENT = 'president', 'President'
+        ASM = 'asm', 'ASM'
+        SM = 'sm', 'Sales Manager'
+        TEAMLEAD = 'teamlead', 'Teamlead'
+        TECHMGR = 'techmgr', 'Technical Manager'
+        ASST_TECHMGR = 'asst_techmgr', 'Assistant Technical Manager'
+
+    ROLE_CHOICES = tuple(Role.choices)
+    role = models.CharField(max_length=20, choices=Role.choices, default=Role.SALESPERSON, db_index=True)
     initials = models.CharField(max_length=3, blank=True, help_text='3-letter initials for the user (e.g., JDO for John Doe)')
     is_active = models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.')
 